@@ -1,18 +1,47 @@
 import os
 from flask import Flask
 from dotenv import load_dotenv
+from jinja2 import FileSystemBytecodeCache
+from cache import init_cache
+from ledger import init_ledger
+from metrics import init_metrics
 from models import db
-
-load_dotenv()
+from schema import upgrade_schema
+from search import init_search
+from summary import init_summary
+from tuning import config_from_env, configure_engine
 
 
 def _configure_app(app, test_config):
     if test_config:
         app.config.update(test_config)
     else:
+        load_dotenv()
         app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv(
             'DATABASE_URL', 'sqlite:///warehouse.db'
         )
+        app.config['SQLALCHEMY_READ_REPLICAS'] = [
+            uri for uri in os.getenv('DATABASE_REPLICA_URLS', '').split(',')
+            if uri.strip()
+        ]
+        app.config.update(config_from_env())
+        app.config['METRICS_ENABLED'] = \
+            os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+        app.config['TEMPLATE_CACHE_DIR'] = os.getenv('TEMPLATE_CACHE_DIR')
+
+
+def _register_blueprints(app):
+    # pylint: disable=import-outside-toplevel
+    from routes import warehouse_bp
+    from changes import changes_bp
+    from batch import batch_bp
+    from ledger import ledger_bp
+    from importer import import_bp
+    app.register_blueprint(warehouse_bp)
+    app.register_blueprint(changes_bp)
+    app.register_blueprint(batch_bp)
+    app.register_blueprint(ledger_bp)
+    app.register_blueprint(import_bp)
 
 
 def create_app(test_config=None):
@@ -20,14 +49,26 @@ def create_app(test_config=None):
     _configure_app(app, test_config)
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
+    # Templates still compile on first render, but only once per machine
+    app.jinja_options = {
+        **app.jinja_options,
+        'bytecode_cache': FileSystemBytecodeCache(
+            app.config.get('TEMPLATE_CACHE_DIR')
+        )
+    }
 
     db.init_app(app)
-    # pylint: disable=import-outside-toplevel
-    from routes import warehouse_bp
-    app.register_blueprint(warehouse_bp)
+    init_cache(app)
+    _register_blueprints(app)
 
     with app.app_context():
-        db.create_all()
+        configure_engine(app)
+        upgrade_schema()
+        init_search(app)
+        init_summary(app)
+        init_ledger(app)
+        if app.config.get('METRICS_ENABLED'):
+            init_metrics(app)
 
     return app
 
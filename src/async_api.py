@@ -0,0 +1,113 @@
+import asyncio
+import io
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from app import create_app
+
+DEFAULT_MAX_WORKERS = 8
+READ_PATHS = re.compile(r'^/warehouses(/\d+)?$')
+
+
+class AsyncReadAPI:
+    # ASGI application serving the read endpoints (list_warehouses and
+    # get_warehouse) of a Flask app. Each request is rendered on a bounded
+    # thread pool and the connection is then served from the event loop, so
+    # slow or idle polling clients do not hold a worker thread.
+
+    def __init__(self, app, max_workers=DEFAULT_MAX_WORKERS):
+        self.app = app
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='async-read'
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] == 'websocket':
+            # Closing before accepting makes the server answer 403
+            await send({'type': 'websocket.close'})
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f"Unsupported ASGI scope type {scope['type']}")
+        environ = asgi_environ(scope)
+        if environ['REQUEST_METHOD'] != 'GET' \
+                or not READ_PATHS.match(environ['PATH_INFO']):
+            await _send_response(send, 404, [], b'')
+            return
+        status, headers, body = await asyncio.get_running_loop() \
+            .run_in_executor(self.executor, self._render, environ)
+        await _send_response(send, status, headers, body)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _render(self, environ):
+        with self.app.request_context(environ):
+            response = self.app.full_dispatch_request()
+            headers = [(k.encode('latin-1'), v.encode('latin-1'))
+                       for k, v in response.headers.items()]
+            return response.status_code, headers, response.get_data()
+
+
+def _latin1(text):
+    # WSGI carries paths as bytes decoded with latin-1
+    return text.encode('utf-8').decode('latin-1')
+
+
+def asgi_environ(scope):
+    # Reads have no body; path is the full path, of which root_path is
+    # the mount point
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    root_path = scope.get('root_path', '')
+    path = scope['path']
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': _latin1(root_path),
+        'PATH_INFO': _latin1(path),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        key = name.decode('latin-1').upper().replace('-', '_')
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = f'HTTP_{key}'
+        value = value.decode('latin-1')
+        if key in environ:
+            separator = '; ' if key == 'HTTP_COOKIE' else ','
+            value = environ[key] + separator + value
+        environ[key] = value
+    return environ
+
+
+async def _send_response(send, status, headers, body):
+    await send({
+        'type': 'http.response.start', 'status': status, 'headers': headers
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def create_async_app(test_config=None, max_workers=DEFAULT_MAX_WORKERS):
+    return AsyncReadAPI(create_app(test_config), max_workers)
@@ -0,0 +1,201 @@
+from flask import Blueprint, jsonify, request
+from sqlalchemy import delete, insert, select
+from changes import record_change
+from models import db, Warehouse, Item, touch_warehouse
+from stock import add_stock, take_stock, transfer_stock, lock_warehouses, \
+    fit_new_stock
+from validation import validate_item
+
+batch_bp = Blueprint('batch', __name__)
+
+MAX_BATCH_OPERATIONS = 10000
+WAREHOUSE_FIELDS = ('warehouse_id', 'from_warehouse_id', 'to_warehouse_id')
+
+
+class BatchError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _field(operation, key, kind=int):
+    try:
+        return kind(operation[key])
+    except KeyError as error:
+        raise BatchError(f'{key} is required') from error
+    except (ValueError, TypeError) as error:
+        raise BatchError(f'{key} must be a number') from error
+
+
+def _create_item(operation, touched):
+    warehouse_id = _field(operation, 'warehouse_id')
+    data, error = validate_item(operation.get('name'),
+                                operation.get('quantity', 0.0))
+    if error:
+        raise BatchError(error)
+    if db.session.execute(select(Warehouse.id).where(
+            Warehouse.id == warehouse_id)).scalar() is None:
+        raise BatchError('Warehouse not found', 404)
+
+    item = {'warehouse_id': warehouse_id,
+            **fit_new_stock(warehouse_id, [data])[0]}
+    item['id'] = db.session.execute(
+        insert(Item).returning(Item.id), item
+    ).scalar()
+    record_change('item', 'create', item['id'], warehouse_id, item)
+    touched.add(warehouse_id)
+    return item
+
+
+def _adjust_quantity(operation, touched):
+    warehouse_id = _field(operation, 'warehouse_id')
+    item_id = _field(operation, 'item_id')
+    delta = _field(operation, 'delta', float)
+
+    if delta >= 0:
+        quantity = add_stock(warehouse_id, item_id, delta)
+    else:
+        try:
+            result = take_stock(warehouse_id, item_id, -delta)
+        except RuntimeError as error:
+            raise BatchError(str(error), 409) from error
+        quantity = result[1] if result is not None else None
+    if quantity is None:
+        raise BatchError('Item not found', 404)
+
+    record_change('item', 'update', item_id, warehouse_id,
+                  {'id': item_id, 'quantity': quantity})
+    touched.add(warehouse_id)
+    return {'id': item_id, 'quantity': quantity}
+
+
+def _delete_item(operation, touched):
+    warehouse_id = _field(operation, 'warehouse_id')
+    item_id = _field(operation, 'item_id')
+    deleted = db.session.execute(delete(Item).where(
+        Item.id == item_id, Item.warehouse_id == warehouse_id
+    )).rowcount
+    if not deleted:
+        raise BatchError('Item not found', 404)
+
+    record_change('item', 'delete', item_id, warehouse_id)
+    touched.add(warehouse_id)
+    return {'id': item_id, 'deleted': True}
+
+
+def _transfer(operation, touched):
+    from_id = _field(operation, 'from_warehouse_id')
+    to_id = _field(operation, 'to_warehouse_id')
+    amount = _field(operation, 'amount', float)
+    name = str(operation.get('name') or '').strip()
+    if not name:
+        raise BatchError('Item name is required')
+    if from_id == to_id:
+        raise BatchError('Source and target warehouse must differ')
+
+    try:
+        result = transfer_stock(from_id, to_id, name, amount)
+    except LookupError as error:
+        raise BatchError(str(error), 404) from error
+    except RuntimeError as error:
+        raise BatchError(str(error), 409) from error
+
+    if not result['moved']:
+        return result
+    source, target = result['source'], result['target']
+    record_change('item', 'update', source['id'], from_id,
+                  {'id': source['id'], 'quantity': source['quantity']})
+    if target['created']:
+        record_change('item', 'create', target['id'], to_id, {
+            'id': target['id'], 'name': name,
+            'quantity': target['quantity'], 'warehouse_id': to_id
+        })
+    else:
+        record_change('item', 'update', target['id'], to_id,
+                      {'id': target['id'], 'quantity': target['quantity']})
+    touched.update((from_id, to_id))
+    return result
+
+
+OPERATIONS = {
+    'create_item': _create_item,
+    'adjust_quantity': _adjust_quantity,
+    'delete_item': _delete_item,
+    'transfer': _transfer
+}
+
+
+def _apply(operation, touched):
+    if not isinstance(operation, dict):
+        raise BatchError('Operation must be an object')
+    op = operation.get('op')
+    handler = OPERATIONS.get(op) if isinstance(op, str) else None
+    if handler is None:
+        raise BatchError('Unknown operation')
+    return {'op': operation['op'], **handler(operation, touched)}
+
+
+def _warehouse_id(value):
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _warehouse_ids(operations):
+    warehouse_ids = {
+        _warehouse_id(operation.get(key)) for operation in operations
+        if isinstance(operation, dict) for key in WAREHOUSE_FIELDS
+    }
+    warehouse_ids.discard(None)
+    return warehouse_ids
+
+
+def _commit(touched):
+    for warehouse_id in sorted(touched):
+        touch_warehouse(warehouse_id)
+    db.session.commit()
+
+
+@batch_bp.route('/batch', methods=['POST'])
+def run_batch():
+    operations = request.get_json(silent=True)
+    if not isinstance(operations, list):
+        return jsonify({'error': 'Expected a list of operations'}), 400
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return jsonify({
+            'error': f'At most {MAX_BATCH_OPERATIONS} operations per batch'
+        }), 400
+
+    # Every operation shares one transaction; the first failure undoes all
+    lock_warehouses(_warehouse_ids(operations))
+    touched = set()
+    results = []
+    for index, operation in enumerate(operations):
+        try:
+            results.append(_apply(operation, touched))
+        except BatchError as error:
+            db.session.rollback()
+            return jsonify({'error': str(error), 'index': index}), \
+                error.status
+
+    _commit(touched)
+    return jsonify({'results': results})
+
+
+@batch_bp.route('/transfers', methods=['POST'])
+def create_transfer():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a transfer object'}), 400
+
+    lock_warehouses(_warehouse_ids([data]))
+    touched = set()
+    try:
+        result = _transfer(data, touched)
+    except BatchError as error:
+        db.session.rollback()
+        return jsonify({'error': str(error)}), error.status
+
+    _commit(touched)
+    return jsonify(result)
@@ -0,0 +1,186 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from werkzeug.serving import WSGIRequestHandler, make_server
+from app import create_app
+from models import db, Warehouse, Item
+
+DEFAULT_TOLERANCE = 0.2
+
+
+class TestClientDriver:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None):
+        response = self.client.open(path, method=method, json=body)
+        return response.status_code
+
+    def close(self):
+        pass
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class ServerDriver:
+    def __init__(self, app):
+        self.server = make_server('127.0.0.1', 0, app, threaded=True,
+                                  request_handler=_QuietHandler)
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(
+            self.base_url + path, data=data, method=method,
+            headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            return response.status
+
+    def close(self):
+        self.server.shutdown()
+        self.thread.join()
+
+
+DRIVERS = {'client': TestClientDriver, 'server': ServerDriver}
+
+
+def seed(app, warehouses, items):
+    with app.app_context():
+        db.session.execute(db.insert(Warehouse), [
+            {'name': f'Warehouse {i}'} for i in range(warehouses)
+        ])
+        ids = db.session.execute(db.select(Warehouse.id)).scalars().all()
+        db.session.execute(db.insert(Item), [
+            {'name': f'Item {j}', 'quantity': 1.0, 'warehouse_id': w}
+            for w in ids for j in range(items)
+        ])
+        db.session.commit()
+        return ids[0]
+
+
+def _scenarios(warehouse_id, item_ids):
+    items_path = f'/warehouses/{warehouse_id}/items'
+    return {
+        'index': lambda i: ('GET', '/', None),
+        'list_warehouses': lambda i: ('GET', '/warehouses', None),
+        'get_warehouse':
+            lambda i: ('GET', f'/warehouses/{warehouse_id}', None),
+        'add_item':
+            lambda i: ('POST', items_path, {'name': f'New {i}'}),
+        'remove_item':
+            lambda i: ('DELETE', f'{items_path}/{item_ids[i]}', None),
+    }
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _measure(driver, scenario, iterations):
+    samples = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        request_start = time.perf_counter()
+        status = driver.request(*scenario(i))
+        samples.append(time.perf_counter() - request_start)
+        if status >= 400:
+            raise RuntimeError(f'Request failed with status {status}')
+    elapsed = time.perf_counter() - start
+    return {
+        'p50_ms': _percentile(samples, 0.50) * 1000,
+        'p99_ms': _percentile(samples, 0.99) * 1000,
+        'throughput': iterations / elapsed,
+    }
+
+
+def run(driver_name='client', warehouses=100, items=10, iterations=200):
+    handle, path = tempfile.mkstemp(suffix='.db')
+    os.close(handle)
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+    warehouse_id = seed(app, warehouses, items)
+    seed_items = [{'name': 'Remove me'} for _ in range(iterations)]
+    app.test_client().post(f'/warehouses/{warehouse_id}/items:bulk',
+                           json=seed_items)
+    with app.app_context():
+        item_ids = db.session.execute(
+            db.select(Item.id).where(Item.warehouse_id == warehouse_id,
+                                     Item.name == 'Remove me')
+        ).scalars().all()
+        db.engine.dispose()
+
+    driver = DRIVERS[driver_name](app)
+    try:
+        results = {
+            name: _measure(driver, scenario, iterations)
+            for name, scenario in _scenarios(warehouse_id, item_ids).items()
+        }
+    finally:
+        driver.close()
+        os.remove(path)
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    regressions = []
+    for name, stats in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if stats['p50_ms'] > expected['p50_ms'] * (1 + tolerance):
+            regressions.append(f'{name}: p50 {stats["p50_ms"]:.2f} ms '
+                               f'(baseline {expected["p50_ms"]:.2f} ms)')
+        if stats['throughput'] < expected['throughput'] * (1 - tolerance):
+            regressions.append(
+                f'{name}: {stats["throughput"]:.0f} req/s '
+                f'(baseline {expected["throughput"]:.0f} req/s)'
+            )
+    return regressions
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description='Warehouse API benchmark')
+    parser.add_argument('--driver', choices=DRIVERS, default='client')
+    parser.add_argument('--warehouses', type=int, default=100)
+    parser.add_argument('--items', type=int, default=10)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--output', help='write results as JSON here')
+    parser.add_argument('--baseline', help='fail on regression against this')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    results = run(args.driver, args.warehouses, args.items, args.iterations)
+    for name, stats in results.items():
+        print(f'{name}: p50 {stats["p50_ms"]:.2f} ms, '
+              f'p99 {stats["p99_ms"]:.2f} ms, '
+              f'{stats["throughput"]:.0f} req/s')
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(results, output, indent=2)
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding='utf-8') as baseline:
+        regressions = compare(results, json.load(baseline), args.tolerance)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+import http.client
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit
+from async_api import AsyncReadAPI
+from app import create_app
+from benchmarks.api_benchmark import ServerDriver
+from models import db, Warehouse, Item
+
+CLIENTS = 50
+REQUESTS_PER_CLIENT = 20
+WORKERS = 8
+THINK_TIME = 0.05
+
+Load = namedtuple('Load', 'clients requests workers think_time')
+
+
+def _seed(app):
+    with app.app_context():
+        warehouse = Warehouse(name='Polled')
+        warehouse.items.extend(
+            Item(name=f'Item {i}', quantity=1.0) for i in range(50)
+        )
+        db.session.add(warehouse)
+        db.session.commit()
+        return warehouse.id
+
+
+class AsgiServerDriver:
+    # AsyncReadAPI behind uvicorn, which is not a project dependency
+    def __init__(self, app, workers):
+        import uvicorn  # pylint: disable=import-outside-toplevel
+        self.api = AsyncReadAPI(app, max_workers=workers)
+        self.socket = socket.socket()
+        self.socket.bind(('127.0.0.1', 0))
+        self.base_url = f'http://127.0.0.1:{self.socket.getsockname()[1]}'
+        self.server = uvicorn.Server(uvicorn.Config(
+            self.api, lifespan='off', log_level='warning', access_log=False
+        ))
+        self.thread = threading.Thread(
+            target=self.server.run, kwargs={'sockets': [self.socket]}
+        )
+        self.thread.start()
+        while not self.server.started and self.thread.is_alive():
+            time.sleep(0.01)
+
+    def close(self):
+        self.server.should_exit = True
+        self.thread.join()
+        self.socket.close()
+        self.api.executor.shutdown()
+
+
+def _poll(base_url, path, load, latencies):
+    # One connection per request, then the client's think time; the server
+    # only ever sees real sockets, as with clients on a network
+    address = urlsplit(base_url)
+    for _ in range(load.requests):
+        start = time.perf_counter()
+        connection = http.client.HTTPConnection(address.hostname,
+                                                address.port)
+        connection.request('GET', path, headers={'Connection': 'close'})
+        response = connection.getresponse()
+        response.read()
+        connection.close()
+        if response.status != 200:
+            raise RuntimeError(f'Request failed with status {response.status}')
+        latencies.append(time.perf_counter() - start)
+        time.sleep(load.think_time)
+
+
+def _measure(driver, path, load):
+    latencies = []
+    clients = [
+        threading.Thread(target=_poll,
+                         args=(driver.base_url, path, load, latencies))
+        for _ in range(load.clients)
+    ]
+    start = time.perf_counter()
+    try:
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+    finally:
+        driver.close()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'throughput': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1,
+                                int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def run(load=Load(CLIENTS, REQUESTS_PER_CLIENT, WORKERS, THINK_TIME)):
+    # Returns None for async when uvicorn is not installed
+    handle, path = tempfile.mkstemp(suffix='.db')
+    os.close(handle)
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+    url = f'/warehouses/{_seed(app)}'
+    try:
+        results = {'threaded': _measure(ServerDriver(app), url, load)}
+        try:
+            driver = AsgiServerDriver(app, load.workers)
+        except ImportError:
+            results['async'] = None
+        else:
+            results['async'] = _measure(driver, url, load)
+        return results
+    finally:
+        with app.app_context():
+            db.engine.dispose()
+        os.remove(path)
+
+
+def main():
+    print(f'{CLIENTS} polling clients, {THINK_TIME * 1000:.0f} ms between '
+          f'requests, {WORKERS} workers for the ASGI layer')
+    for mode, stats in run().items():
+        if stats is None:
+            print(f'{mode}: skipped, uvicorn is not installed')
+            continue
+        print(f"{mode}: {stats['throughput']:,.0f} requests / s, "
+              f"p50 {stats['p50_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
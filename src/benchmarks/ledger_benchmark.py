@@ -0,0 +1,57 @@
+import random
+import time
+from varasto import Varasto, VarastoKirjanpito, toista
+
+TAPAHTUMIA = 10_000_000
+KYSELYJA = 1000
+
+
+def _kirjanpito(tapahtumia, tilannevali):
+    satunnainen = random.Random(42)
+    kirjanpito = VarastoKirjanpito(1000.0, tilannevali=tilannevali)
+    kirjanpito.kirjaa_tapahtumat(
+        satunnainen.uniform(-50.0, 50.0) for _ in range(tapahtumia)
+    )
+    return kirjanpito
+
+
+def _toista_alusta(kirjanpito, hetki):
+    varasto = Varasto(kirjanpito.varasto.tilavuus,
+                      kirjanpito.saldo_hetkella(0))
+    return toista(varasto, kirjanpito.tapahtumat[:hetki])
+
+
+def toisto(tapahtumia=TAPAHTUMIA, kyselyja=KYSELYJA, tilannevali=1024):
+    # saldo satunnaisilla hetkillä: tilannekuvista vs. koko historiasta
+    alku = time.perf_counter()
+    kirjanpito = _kirjanpito(tapahtumia, tilannevali)
+    kirjaus = tapahtumia / (time.perf_counter() - alku)
+
+    satunnainen = random.Random(7)
+    hetket = [satunnainen.randint(0, tapahtumia) for _ in range(kyselyja)]
+    alku = time.perf_counter()
+    for hetki in hetket:
+        kirjanpito.saldo_hetkella(hetki)
+    tilannekuvista = kyselyja / (time.perf_counter() - alku)
+
+    alusta = hetket[:max(1, kyselyja // 100)]
+    alku = time.perf_counter()
+    for hetki in alusta:
+        _toista_alusta(kirjanpito, hetki)
+    historiasta = len(alusta) / (time.perf_counter() - alku)
+
+    return {
+        "kirjaus": kirjaus,
+        "saldo tilannekuvista": tilannekuvista,
+        "saldo koko historiasta": historiasta,
+    }
+
+
+def main():
+    print(f"{TAPAHTUMIA:,} tapahtumaa")
+    for mittaus, nopeus in toisto().items():
+        print(f"{mittaus}: {nopeus:,.0f} / s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import os
+import random
+import time
+import simulaatio
+
+SKENAARIOITA = 2000
+TAPAHTUMIA = 2000
+
+
+def satunnaiset_skenaariot(maara, tapahtumia=50, siemen=99):
+    satunnainen = random.Random(siemen)
+    return [
+        {
+            "nimi": f"s{i}",
+            "varastot": [
+                (satunnainen.uniform(0, 50), satunnainen.uniform(0, 20))
+                for _ in range(3)
+            ],
+            "tapahtumat": [
+                (satunnainen.randrange(3), satunnainen.uniform(-15, 15))
+                for _ in range(tapahtumia)
+            ],
+        }
+        for i in range(maara)
+    ]
+
+
+def skaalautuvuus(maara=SKENAARIOITA, tapahtumia=TAPAHTUMIA,
+                  prosessimaarat=None):
+    skenaariot = satunnaiset_skenaariot(maara, tapahtumia)
+    prosessimaarat = prosessimaarat or sorted({1, 2, os.cpu_count() or 1})
+    sarjassa = None
+    tulokset = {}
+    for prosesseja in prosessimaarat:
+        alku = time.perf_counter()
+        tulos = simulaatio.aja(skenaariot, prosesseja)
+        kesto = time.perf_counter() - alku
+        if sarjassa is None:
+            sarjassa = tulos
+        tulokset[prosesseja] = {
+            "skenaariota / s": maara / kesto,
+            "sama kuin sarjassa": tulos == sarjassa,
+        }
+    return tulokset
+
+
+def main():
+    for prosesseja, tulos in skaalautuvuus().items():
+        print(f"{prosesseja} prosessia: "
+              f"{tulos['skenaariota / s']:,.0f} skenaariota / s, "
+              f"sama kuin sarjassa: {tulos['sama kuin sarjassa']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app import create_app
+from models import db, Warehouse
+
+THREADS = 8
+REQUESTS_PER_THREAD = 200
+
+
+def _worker(app, warehouse_id, requests):
+    client = app.test_client()
+    errors = 0
+    for i in range(requests):
+        if i % 4 == 3:
+            response = client.get(f'/warehouses/{warehouse_id}')
+        else:
+            response = client.post(
+                f'/warehouses/{warehouse_id}/items',
+                json={'name': f'Item{i}', 'quantity': 1.0}
+            )
+        errors += response.status_code >= 500
+    return errors
+
+
+def run(profile, threads=THREADS, requests=REQUESTS_PER_THREAD):
+    handle, path = tempfile.mkstemp(suffix='.db')
+    os.close(handle)
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'DATABASE_PROFILE': profile,
+    })
+    with app.app_context():
+        warehouse = Warehouse(name='Load')
+        db.session.add(warehouse)
+        db.session.commit()
+        warehouse_id = warehouse.id
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        errors = sum(executor.map(
+            lambda _: _worker(app, warehouse_id, requests), range(threads)
+        ))
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        db.engine.dispose()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return {
+        'profile': profile,
+        'requests_per_second': threads * requests / elapsed,
+        'errors': errors,
+    }
+
+
+def main():
+    for profile in ('default', 'production'):
+        result = run(profile)
+        print(f"{result['profile']}: "
+              f"{result['requests_per_second']:,.0f} requests / s, "
+              f"{result['errors']} errors")
+
+
+if __name__ == '__main__':
+    main()
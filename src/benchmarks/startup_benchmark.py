@@ -0,0 +1,61 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from app import create_app
+from models import db
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BOOT = 'from app import create_app; create_app()'
+
+
+def _cold_start(url):
+    # A fresh interpreter pays imports too, like a newly spawned worker
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, '-c', BOOT], cwd=SRC_DIR, check=True,
+        env={**os.environ, 'DATABASE_URL': url}
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def _create_app_ms(url):
+    start = time.perf_counter()
+    app = create_app({'SQLALCHEMY_DATABASE_URI': url, 'TESTING': True})
+    elapsed = (time.perf_counter() - start) * 1000
+    with app.app_context():
+        db.engine.dispose()
+    return elapsed
+
+
+def run(processes=5, iterations=50):
+    handle, path = tempfile.mkstemp(suffix='.db')
+    os.close(handle)
+    os.remove(path)
+    url = f'sqlite:///{path}'
+    try:
+        first_boot = _cold_start(url)
+        warm_boots = [_cold_start(url) for _ in range(processes)]
+        _create_app_ms('sqlite:///:memory:')
+        in_memory = [_create_app_ms('sqlite:///:memory:')
+                     for _ in range(iterations)]
+        synced = [_create_app_ms(url) for _ in range(iterations)]
+    finally:
+        os.remove(path)
+    return {
+        'first_boot_ms': first_boot,
+        'cold_start_ms': statistics.median(warm_boots),
+        'create_app_memory_ms': statistics.median(in_memory),
+        'create_app_synced_ms': statistics.median(synced),
+    }
+
+
+def main():
+    for name, value in run().items():
+        print(f'{name}: {value:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import sys
+import time
+import tracemalloc
+from varasto import Varasto
+
+INSTANSSEJA = 1_000_000
+
+
+def muistia_per_varasto(maara=INSTANSSEJA):
+    tracemalloc.start()
+    alku, _ = tracemalloc.get_traced_memory()
+    varastot = [Varasto(100.0, 10.0) for _ in range(maara)]
+    loppu, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (loppu - alku - sys.getsizeof(varastot)) / len(varastot)
+
+
+def _ajasta(funktio, maara):
+    alku = time.perf_counter()
+    funktio()
+    return maara / (time.perf_counter() - alku)
+
+
+def lapimeno(maara=INSTANSSEJA):
+    varastot = []
+
+    def luo():
+        varastot.extend(Varasto(100.0) for _ in range(maara))
+
+    def lisaa():
+        for varasto in varastot:
+            varasto.lisaa_varastoon(60.0)
+
+    def ota():
+        for varasto in varastot:
+            varasto.ota_varastosta(25.0)
+
+    return {
+        "luonti": _ajasta(luo, maara),
+        "lisays": _ajasta(lisaa, maara),
+        "otto": _ajasta(ota, maara),
+    }
+
+
+def main():
+    print(f"muistia / varasto: {muistia_per_varasto():.1f} tavua")
+    for operaatio, nopeus in lapimeno().items():
+        print(f"{operaatio}: {nopeus:,.0f} operaatiota / s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import threading
+from collections import OrderedDict
+from flask import Response, current_app, request
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+class ResponseCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+def init_cache(app):
+    app.extensions['response_cache'] = ResponseCache(
+        app.config.get('RESPONSE_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+    )
+
+
+def cached_json(etag, build):
+    # The ETag changes whenever the underlying rows change, so it is also
+    # a safe cache key for the serialized body.
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        cache = current_app.extensions['response_cache']
+        body = cache.get(etag)
+        if body is None:
+            body = current_app.json.dumps(build()).encode()
+            cache.put(etag, body)
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response
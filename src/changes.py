@@ -0,0 +1,102 @@
+import json
+import time
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask import stream_with_context
+from sqlalchemy import insert
+from models import db, Change
+
+changes_bp = Blueprint('changes', __name__)
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+DEFAULT_POLL_SECONDS = 1.0
+DEFAULT_STREAM_SECONDS = 300
+
+
+def _change_row(entity, action, entity_id, warehouse_id, data):
+    return {
+        'entity': entity,
+        'action': action,
+        'entity_id': entity_id,
+        'warehouse_id': warehouse_id,
+        'data': json.dumps(data) if data is not None else None
+    }
+
+
+def record_change(entity, action, entity_id, warehouse_id, data=None):
+    db.session.execute(insert(Change), [
+        _change_row(entity, action, entity_id, warehouse_id, data)
+    ])
+
+
+def record_item_changes(action, items):
+    if items:
+        db.session.execute(insert(Change), [
+            _change_row('item', action, item['id'], item['warehouse_id'], item)
+            for item in items
+        ])
+
+
+def record_item_deletes(item_ids, warehouse_id):
+    if item_ids:
+        db.session.execute(insert(Change), [
+            _change_row('item', 'delete', item_id, warehouse_id, None)
+            for item_id in item_ids
+        ])
+
+
+def _since():
+    since = request.args.get('since', request.headers.get('Last-Event-ID'))
+    try:
+        return max(0, int(since or 0))
+    except ValueError:
+        return None
+
+
+def _changes_after(since, limit):
+    return Change.query.filter(Change.seq > since) \
+        .order_by(Change.seq).limit(limit).all()
+
+
+@changes_bp.route('/changes', methods=['GET'])
+def list_changes():
+    since = _since()
+    if since is None:
+        return jsonify({'error': 'since must be an integer'}), 400
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+        limit = min(max(1, limit), MAX_PAGE_SIZE)
+    except ValueError:
+        limit = DEFAULT_PAGE_SIZE
+    return jsonify([c.to_dict() for c in _changes_after(since, limit)])
+
+
+def _event_stream(since):
+    poll = current_app.config.get('CHANGE_STREAM_POLL_SECONDS',
+                                  DEFAULT_POLL_SECONDS)
+    deadline = time.monotonic() + current_app.config.get(
+        'CHANGE_STREAM_MAX_SECONDS', DEFAULT_STREAM_SECONDS
+    )
+    yield 'retry: 1000\n\n'
+    while time.monotonic() < deadline:
+        changes = [c.to_dict() for c in _changes_after(since, MAX_PAGE_SIZE)]
+        # end the read transaction so the next poll sees new commits
+        db.session.rollback()
+        for change in changes:
+            since = change['seq']
+            yield f'id: {since}\nevent: change\ndata: {json.dumps(change)}\n\n'
+        if not changes:
+            yield ': keep-alive\n\n'
+            time.sleep(poll)
+
+
+@changes_bp.route('/changes/stream', methods=['GET'])
+def stream_changes():
+    since = _since()
+    if since is None:
+        return jsonify({'error': 'since must be an integer'}), 400
+    return Response(
+        stream_with_context(_event_stream(since)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
@@ -0,0 +1,12 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def dumps(value):
+    if orjson is not None:
+        return orjson.dumps(value)  # pylint: disable=no-member
+    return json.dumps(value, separators=(',', ':')).encode()
@@ -0,0 +1,238 @@
+import csv
+import io
+import json
+from itertools import islice
+import click
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import bindparam, insert, select, update
+from changes import record_change, record_item_changes
+from models import db, Warehouse, Item, new_revision, touch_warehouse
+from stock import fit_new_stock, lock_warehouses
+from validation import parse_capacity, validate_item
+
+import_bp = Blueprint('import', __name__, cli_group=None)
+
+# One row per line with the keys warehouse, location, description,
+# capacity, item and quantity. Only warehouse is required; rows without an
+# item just upsert the warehouse.
+IMPORT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+
+
+def insert_items(rows):
+    count = len(rows)
+    if rows:
+        inserted = db.session.execute(insert(Item).returning(
+            Item.id, Item.name, Item.quantity, Item.warehouse_id
+        ), rows)
+        record_item_changes('create', [dict(r) for r in inserted.mappings()])
+        rows.clear()
+    return count
+
+
+def _parse_ndjson_line(line):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def request_text(stream):
+    # werkzeug's request stream is unbuffered, which makes reading it line
+    # by line orders of magnitude slower
+    return io.TextIOWrapper(
+        io.BufferedReader(stream), encoding='utf-8', newline=''
+    )
+
+
+def read_rows(stream, file_format):
+    # stream is a text stream; rows are read lazily, one line at a time
+    if file_format == 'csv':
+        return csv.DictReader(stream)
+    return (_parse_ndjson_line(line) for line in stream if line.strip())
+
+
+def _warehouse_fields(data):
+    fields = {}
+    for key in ('location', 'description'):
+        if data.get(key) not in (None, ''):
+            fields[key] = str(data[key]).strip()
+    capacity, error = parse_capacity(data.get('capacity'))
+    if capacity is not None:
+        fields['capacity'] = capacity
+    return fields, error
+
+
+def _parse_row(data):
+    if not isinstance(data, dict):
+        return None, None, None, 'Invalid row'
+    name = str(data.get('warehouse') or '').strip()
+    if not name:
+        return None, None, None, 'Warehouse name is required'
+    fields, error = _warehouse_fields(data)
+    item = None
+    if not error and data.get('item') not in (None, ''):
+        item, error = validate_item(data['item'], data.get('quantity', 0.0))
+    return name, fields, item, error
+
+
+def _upsert_warehouses(warehouses, warehouse_ids, summary):
+    new_names = {name for name in warehouses if name not in warehouse_ids}
+    new = [
+        {'name': name, 'location': '', 'description': '',
+         **warehouses[name], 'revision': new_revision()}
+        for name in sorted(new_names)
+    ]
+    if new:
+        created = db.session.execute(insert(Warehouse).returning(
+            Warehouse.id, Warehouse.name
+        ), new)
+        warehouse_ids.update((r.name, r.id) for r in created)
+        for row in new:
+            warehouse_id = warehouse_ids[row.pop('name')]
+            row.pop('revision')
+            record_change('warehouse', 'create', warehouse_id, warehouse_id,
+                          {'id': warehouse_id, **row})
+        summary['warehouses_created'] += len(new)
+
+    existing = {
+        warehouse_ids[name]: fields for name, fields in warehouses.items()
+        if fields and name not in new_names
+    }
+    changed = _changed_fields(existing)
+    _update_warehouses(changed)
+    for warehouse_id, fields in changed.items():
+        record_change('warehouse', 'update', warehouse_id, warehouse_id,
+                      {'id': warehouse_id, **fields})
+    summary['warehouses_updated'] += len(changed)
+
+
+def _changed_fields(fields_by_id):
+    # Rows that repeat what is stored are not written, so re-importing
+    # the same file neither logs changes nor invalidates cached responses
+    if not fields_by_id:
+        return {}
+    stored = {row.id: row._asdict() for row in db.session.execute(
+        select(Warehouse.id, Warehouse.location, Warehouse.description,
+               Warehouse.capacity).where(Warehouse.id.in_(fields_by_id))
+    )}
+    changed = {}
+    for warehouse_id, fields in fields_by_id.items():
+        differ = {key: value for key, value in fields.items()
+                  if stored[warehouse_id][key] != value}
+        if differ:
+            changed[warehouse_id] = differ
+    return changed
+
+
+def _update_warehouses(changed):
+    # One executemany per combination of changed columns
+    table = Warehouse.__table__
+    groups = {}
+    for warehouse_id, fields in changed.items():
+        groups.setdefault(tuple(sorted(fields)), []).append({
+            'warehouse_id': warehouse_id,
+            **{f'new_{key}': value for key, value in fields.items()}
+        })
+    for columns, rows in groups.items():
+        db.session.execute(update(table).where(
+            table.c.id == bindparam('warehouse_id')
+        ).values({
+            **{column: bindparam(f'new_{column}') for column in columns},
+            'version': table.c.version + 1
+        }), rows)
+
+
+def _add_error(summary, row, error):
+    summary['error_count'] += 1
+    if len(summary['errors']) < MAX_REPORTED_ERRORS:
+        summary['errors'].append({'row': row, 'error': error})
+
+
+def _import_chunk(chunk, warehouse_ids, summary):
+    warehouses = {}
+    items = []
+    for row, data in chunk:
+        summary['rows'] += 1
+        name, fields, item, error = _parse_row(data)
+        if error:
+            _add_error(summary, row, error)
+            continue
+        warehouses.setdefault(name, {}).update(fields)
+        if item is not None:
+            items.append((name, item))
+
+    lock_warehouses({warehouse_ids[name] for name in warehouses
+                     if name in warehouse_ids})
+    _upsert_warehouses(warehouses, warehouse_ids, summary)
+    rows = [{**item, 'warehouse_id': warehouse_ids[name]}
+            for name, item in items]
+    by_warehouse = {}
+    for row in rows:
+        by_warehouse.setdefault(row['warehouse_id'], []).append(row)
+    for warehouse_id, stocked in sorted(by_warehouse.items()):
+        fit_new_stock(warehouse_id, stocked)
+    summary['items_inserted'] += insert_items(rows)
+    for warehouse_id in sorted(by_warehouse):
+        touch_warehouse(warehouse_id)
+    db.session.commit()
+
+
+def import_rows(rows, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+    # Warehouse names are resolved once up front and the map is kept up to
+    # date as warehouses are created; each chunk is its own transaction.
+    warehouse_ids = dict(
+        db.session.execute(select(Warehouse.name, Warehouse.id)).all()
+    )
+    summary = {
+        'rows': 0, 'warehouses_created': 0, 'warehouses_updated': 0,
+        'items_inserted': 0, 'error_count': 0, 'errors': []
+    }
+    numbered = enumerate(rows)
+    while chunk := list(islice(numbered, chunk_size)):
+        _import_chunk(chunk, warehouse_ids, summary)
+        if progress is not None:
+            progress(summary)
+    return summary
+
+
+def _file_format(mimetype_or_path):
+    if mimetype_or_path.lower().endswith('csv'):
+        return 'csv'
+    return 'ndjson'
+
+
+@import_bp.route('/import', methods=['POST'])
+def import_file():
+    if request.mimetype not in ('text/csv', 'application/x-ndjson'):
+        return jsonify({
+            'error': 'Expected text/csv or application/x-ndjson'
+        }), 415
+    stream = request_text(request.stream)
+    chunk_size = current_app.config.get('IMPORT_CHUNK_SIZE',
+                                        IMPORT_CHUNK_SIZE)
+
+    def progress(summary):
+        current_app.logger.info('Imported %d rows', summary['rows'])
+
+    summary = import_rows(read_rows(stream, _file_format(request.mimetype)),
+                          chunk_size, progress)
+    return jsonify(summary), 201
+
+
+@import_bp.cli.command(
+    'import', help='Import warehouses and items from a CSV or NDJSON file.'
+)
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--chunk-size', default=IMPORT_CHUNK_SIZE, show_default=True)
+def import_command(path, chunk_size):
+    def progress(summary):
+        click.echo(f"{summary['rows']:,} rows, "
+                   f"{summary['warehouses_created']:,} warehouses created, "
+                   f"{summary['items_inserted']:,} items inserted, "
+                   f"{summary['error_count']:,} errors", err=True)
+
+    with open(path, encoding='utf-8', newline='') as stream:
+        summary = import_rows(read_rows(stream, _file_format(path)),
+                              chunk_size, progress)
+    click.echo(json.dumps(summary, indent=2))
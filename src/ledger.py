@@ -0,0 +1,155 @@
+from flask import Blueprint, current_app, jsonify, request
+from models import db, ItemMovement
+
+ledger_bp = Blueprint('ledger', __name__)
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+# Every change to an item's quantity is appended to item_movements by
+# triggers, together with the quantity it left behind. Each movement is
+# its own snapshot, so a past quantity is one indexed lookup, not a replay.
+_NOW = "(julianday('now') - 2440587.5) * 86400.0"
+
+
+def _movement(values):
+    return f"""
+        INSERT INTO item_movements
+            (item_id, warehouse_id, delta, quantity, recorded_at)
+        VALUES ({values}, {_NOW});"""
+
+
+_TRIGGERS = {
+    'items_ledger_insert': f"""
+        AFTER INSERT ON items
+        BEGIN {_movement(
+            'new.id, new.warehouse_id, new.quantity, new.quantity'
+        )} END""",
+    'items_ledger_quantity': f"""
+        AFTER UPDATE OF quantity ON items
+        WHEN new.quantity != old.quantity
+        BEGIN {_movement(
+            'new.id, new.warehouse_id, new.quantity - old.quantity, '
+            'new.quantity'
+        )} END""",
+    'items_ledger_delete': f"""
+        AFTER DELETE ON items
+        BEGIN {_movement(
+            'old.id, old.warehouse_id, -old.quantity, 0.0'
+        )} END""",
+}
+
+_BACKFILL = f"""
+    INSERT INTO item_movements
+        (item_id, warehouse_id, delta, quantity, recorded_at)
+    SELECT id, warehouse_id, quantity, quantity, {_NOW} FROM items
+    WHERE NOT EXISTS (
+        SELECT 1 FROM item_movements WHERE item_movements.item_id = items.id
+    )"""
+
+
+# Item ids from before AUTOINCREMENT may have been deleted above the
+# current maximum; the sequence starts past every id the ledger has seen.
+_SEQUENCE_FLOOR = (
+    """UPDATE sqlite_sequence
+    SET seq = MAX(seq, (SELECT MAX(item_id) FROM item_movements))
+    WHERE name = 'items'
+        AND EXISTS (SELECT 1 FROM item_movements)""",
+    """INSERT INTO sqlite_sequence (name, seq)
+    SELECT 'items', MAX(item_id) FROM item_movements
+    WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'items')
+    HAVING MAX(item_id) IS NOT NULL""",
+)
+
+
+def init_ledger(app):
+    enabled = db.engine.dialect.name == 'sqlite'
+    if enabled:
+        with db.engine.begin() as connection:
+            existing = set(connection.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+            ).scalars())
+            missing = set(_TRIGGERS) - existing
+            for name in sorted(missing):
+                connection.exec_driver_sql(
+                    f'CREATE TRIGGER {name} {_TRIGGERS[name]}'
+                )
+            if missing:
+                # items stocked before the ledger start from an opening entry
+                connection.exec_driver_sql(_BACKFILL)
+                for statement in _SEQUENCE_FLOOR:
+                    connection.exec_driver_sql(statement)
+    app.extensions['item_ledger'] = enabled
+
+
+def _movements(warehouse_id, item_id):
+    return ItemMovement.query.filter(
+        ItemMovement.item_id == item_id,
+        ItemMovement.warehouse_id == warehouse_id
+    )
+
+
+def quantity_at(warehouse_id, item_id, at=None, seq=None):
+    query = _movements(warehouse_id, item_id)
+    if seq is not None:
+        return query.filter(ItemMovement.seq <= seq) \
+            .order_by(ItemMovement.seq.desc()).first()
+    if at is not None:
+        query = query.filter(ItemMovement.recorded_at <= at)
+    return query.order_by(
+        ItemMovement.recorded_at.desc(), ItemMovement.seq.desc()
+    ).first()
+
+
+def _number_arg(name, kind):
+    value = request.args.get(name)
+    if value is None:
+        return None
+    return kind(value)
+
+
+@ledger_bp.route(
+    '/warehouses/<int:warehouse_id>/items/<int:item_id>/movements',
+    methods=['GET']
+)
+def list_movements(warehouse_id, item_id):
+    if not current_app.extensions.get('item_ledger'):
+        return jsonify({'error': 'Item ledger is not available'}), 501
+    try:
+        after = max(0, _number_arg('after', int) or 0)
+        limit = min(max(0, _number_arg('limit', int) or DEFAULT_PAGE_SIZE),
+                    MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'after and limit must be integers'}), 400
+
+    rows = _movements(warehouse_id, item_id) \
+        .filter(ItemMovement.seq > after) \
+        .order_by(ItemMovement.seq).limit(limit + 1).all()
+    response = jsonify([m.to_dict() for m in rows[:limit]])
+    if len(rows) > limit and limit:
+        response.headers['X-Next-After'] = str(rows[limit - 1].seq)
+    return response
+
+
+@ledger_bp.route(
+    '/warehouses/<int:warehouse_id>/items/<int:item_id>/quantity',
+    methods=['GET']
+)
+def get_quantity_at(warehouse_id, item_id):
+    if not current_app.extensions.get('item_ledger'):
+        return jsonify({'error': 'Item ledger is not available'}), 501
+    try:
+        at = _number_arg('at', float)
+        seq = _number_arg('seq', int)
+    except ValueError:
+        return jsonify({'error': 'at and seq must be numbers'}), 400
+
+    movement = quantity_at(warehouse_id, item_id, at, seq)
+    if movement is None:
+        return jsonify({'error': 'No movements recorded by then'}), 404
+    return jsonify({
+        'id': item_id,
+        'quantity': movement.quantity,
+        'seq': movement.seq,
+        'recorded_at': movement.recorded_at
+    })
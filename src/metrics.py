@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from models import db
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+
+
+class _EndpointStats:
+    __slots__ = ('buckets', 'count', 'seconds', 'statements',
+                 'statement_seconds', 'n_plus_one')
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = 0
+        self.statement_seconds = 0.0
+        self.n_plus_one = 0
+
+
+class Metrics:
+    def __init__(self, n_plus_one_threshold=DEFAULT_N_PLUS_ONE_THRESHOLD):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._stats = defaultdict(_EndpointStats)
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint, seconds, sql):
+        repeated = any(
+            count >= self.n_plus_one_threshold
+            for count in sql['lazy_loads'].values()
+        )
+        with self._lock:
+            stats = self._stats[endpoint]
+            stats.count += 1
+            stats.seconds += seconds
+            for i, bound in enumerate(BUCKETS):
+                stats.buckets[i] += seconds <= bound
+            stats.statements += sql['count']
+            stats.statement_seconds += sql['seconds']
+            stats.n_plus_one += repeated
+
+    def render(self):
+        with self._lock:
+            stats = sorted(self._stats.items())
+            lines = ['# TYPE http_request_duration_seconds histogram']
+            for endpoint, entry in stats:
+                lines.extend(_histogram_lines(endpoint, entry))
+            for name, attribute in _COUNTERS:
+                lines.append(f'# TYPE {name} counter')
+                lines.extend(
+                    f'{name}{{endpoint="{endpoint}"}} '
+                    f'{getattr(entry, attribute)}'
+                    for endpoint, entry in stats
+                )
+        return '\n'.join(lines) + '\n'
+
+
+_COUNTERS = (
+    ('db_statements_total', 'statements'),
+    ('db_statement_duration_seconds_total', 'statement_seconds'),
+    ('db_n_plus_one_suspected_total', 'n_plus_one'),
+)
+
+
+def _histogram_lines(endpoint, entry):
+    name = 'http_request_duration_seconds'
+    for bound, count in zip(BUCKETS, entry.buckets):
+        yield f'{name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}'
+    yield f'{name}_bucket{{endpoint="{endpoint}",le="+Inf"}} {entry.count}'
+    yield f'{name}_sum{{endpoint="{endpoint}"}} {entry.seconds}'
+    yield f'{name}_count{{endpoint="{endpoint}"}} {entry.count}'
+
+
+# The start time lives on the execution context, which is dropped with the
+# statement; a failed statement never reaches _after_cursor_execute
+def _before_cursor_execute(_conn, _cursor, _statement, _parameters, context,
+                           _executemany):
+    context.metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(_conn, _cursor, statement, _parameters, context,
+                          _executemany):
+    elapsed = time.perf_counter() - context.metrics_start
+    sql = g.get('sql_metrics') if has_request_context() else None
+    if sql is not None:
+        sql['count'] += 1
+        sql['seconds'] += elapsed
+        if context.execution_options.get('metrics_lazy_load'):
+            sql['lazy_loads'][statement] += 1
+
+
+# Only relationship loads count towards the N+1 check; batched or cascaded
+# writes and per-operation lookups repeat their statements too
+def _mark_lazy_load(orm_execute_state):
+    if orm_execute_state.is_relationship_load:
+        orm_execute_state.update_execution_options(metrics_lazy_load=True)
+
+
+def init_metrics(app):
+    metrics = Metrics(app.config.get(
+        'METRICS_N_PLUS_ONE_THRESHOLD', DEFAULT_N_PLUS_ONE_THRESHOLD
+    ))
+    app.extensions['metrics'] = metrics
+
+    # The session is shared by every app
+    if not event.contains(db.session, 'do_orm_execute', _mark_lazy_load):
+        event.listen(db.session, 'do_orm_execute', _mark_lazy_load)
+    # Read replicas have engines of their own
+    for engine in db.engines.values():
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+        g.sql_metrics = {'count': 0, 'seconds': 0.0, 'lazy_loads': Counter()}
+
+    @app.after_request
+    def record_request(response):
+        metrics.observe(
+            request.endpoint or 'unknown',
+            time.perf_counter() - g.request_start, g.sql_metrics
+        )
+        return response
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        return Response(metrics.render(), mimetype='text/plain')
@@ -1,6 +1,12 @@
-from flask_sqlalchemy import SQLAlchemy
+import json
+import secrets
+from replicas import ReplicaSQLAlchemy
 
-db = SQLAlchemy()
+db = ReplicaSQLAlchemy()
+
+
+def new_revision():
+    return secrets.randbits(62)
 
 
 class Warehouse(db.Model):
@@ -10,23 +16,60 @@ class Warehouse(db.Model):
     name = db.Column(db.String(100), nullable=False, unique=True)
     location = db.Column(db.String(200), nullable=True)
     description = db.Column(db.Text, nullable=True)
+    capacity = db.Column(db.Float, nullable=True)
+    # revision changes with anything in the warehouse, items included, and
+    # keys the response caches; version only changes with the warehouse row
+    # itself and guards concurrent edits
+    revision = db.Column(
+        db.BigInteger, nullable=False, default=new_revision,
+        onupdate=new_revision, server_default='0'
+    )
+    version = db.Column(
+        db.Integer, nullable=False, default=1, server_default='1'
+    )
+    item_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0'
+    )
+    total_quantity = db.Column(
+        db.Float, nullable=False, default=0.0, server_default='0'
+    )
+    distinct_item_names = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0'
+    )
 
     items = db.relationship(
-        'Item', backref='warehouse', lazy=True, cascade='all, delete-orphan'
+        'Item', backref='warehouse', lazy=True, cascade='all, delete-orphan',
+        order_by='Item.id'
     )
 
-    def to_dict(self):
-        return {
+    # ORM updates and deletes only match the version they loaded, so a
+    # concurrent edit in between raises StaleDataError instead of being lost
+    __mapper_args__ = {'version_id_col': version}
+
+    def to_dict(self, include_items=True):
+        data = {
             'id': self.id,
             'name': self.name,
             'location': self.location,
             'description': self.description,
-            'items': [item.to_dict() for item in self.items]
+            'capacity': self.capacity
         }
+        if include_items:
+            data['items'] = [item.to_dict() for item in self.items]
+        return data
 
 
 class Item(db.Model):
     __tablename__ = 'items'
+    __table_args__ = (
+        db.Index('ix_items_warehouse_id_id', 'warehouse_id', 'id'),
+        db.Index('ix_items_warehouse_id_name', 'warehouse_id', 'name'),
+        db.Index('ix_items_name_quantity', 'name', 'quantity'),
+        db.Index('ix_items_warehouse_id_quantity', 'warehouse_id', 'quantity'),
+        # ids of deleted items are never handed out again, so histories
+        # keyed by item id (ledger, changes, ETags) stay unambiguous
+        {'sqlite_autoincrement': True}
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -34,6 +77,11 @@ class Item(db.Model):
     warehouse_id = db.Column(
         db.Integer, db.ForeignKey('warehouses.id'), nullable=False
     )
+    version = db.Column(
+        db.Integer, nullable=False, default=1, server_default='1'
+    )
+
+    __mapper_args__ = {'version_id_col': version}
 
     def to_dict(self):
         return {
@@ -42,3 +90,69 @@ class Item(db.Model):
             'quantity': self.quantity,
             'warehouse_id': self.warehouse_id
         }
+
+
+class WarehouseItemName(db.Model):
+    __tablename__ = 'warehouse_item_names'
+
+    warehouse_id = db.Column(
+        db.Integer, db.ForeignKey('warehouses.id'), primary_key=True
+    )
+    name = db.Column(db.String(100), primary_key=True)
+    item_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class Change(db.Model):
+    __tablename__ = 'changes'
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    seq = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)
+    action = db.Column(db.String(20), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    warehouse_id = db.Column(db.Integer, nullable=True)
+    data = db.Column(db.Text, nullable=True)
+
+    def to_dict(self):
+        return {
+            'seq': self.seq,
+            'entity': self.entity,
+            'action': self.action,
+            'id': self.entity_id,
+            'warehouse_id': self.warehouse_id,
+            'data': json.loads(self.data) if self.data else None
+        }
+
+
+class ItemMovement(db.Model):
+    __tablename__ = 'item_movements'
+    __table_args__ = (
+        db.Index('ix_item_movements_item_id_seq', 'item_id', 'seq'),
+        db.Index('ix_item_movements_item_id_recorded_at',
+                 'item_id', 'recorded_at'),
+        {'sqlite_autoincrement': True}
+    )
+
+    seq = db.Column(db.Integer, primary_key=True)
+    item_id = db.Column(db.Integer, nullable=False)
+    warehouse_id = db.Column(db.Integer, nullable=False)
+    delta = db.Column(db.Float, nullable=False)
+    quantity = db.Column(db.Float, nullable=False)
+    recorded_at = db.Column(db.Float, nullable=False)
+
+    def to_dict(self):
+        return {
+            'seq': self.seq,
+            'item_id': self.item_id,
+            'warehouse_id': self.warehouse_id,
+            'delta': self.delta,
+            'quantity': self.quantity,
+            'recorded_at': self.recorded_at
+        }
+
+
+def touch_warehouse(warehouse_id):
+    db.session.execute(
+        db.update(Warehouse).where(Warehouse.id == warehouse_id)
+        .values(revision=new_revision())
+    )
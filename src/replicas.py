@@ -0,0 +1,79 @@
+import threading
+from functools import wraps
+from flask import current_app
+from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+
+# SQLALCHEMY_READ_REPLICAS is a list of database URIs holding copies of the
+# primary database; each becomes a bind named replica-<n>. Keeping the
+# copies up to date is left to the database.
+REPLICA_BIND_PREFIX = 'replica-'
+
+
+class ReplicaRouter:
+    def __init__(self, keys):
+        self.keys = keys
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def choose(self):
+        with self._lock:
+            key = self.keys[self._next % len(self.keys)]
+            self._next += 1
+        return key
+
+
+class ReplicaSession(Session):
+    # Plain SELECTs go to the replica chosen for the request. Anything else
+    # marks the session as having written, and from then on it reads its own
+    # writes from the primary.
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not getattr(clause, 'is_select', False):
+            self.info['wrote'] = True
+        replica = self.info.get('replica')
+        if replica is not None and bind is None \
+                and not self.info.get('wrote'):
+            return self._db.engines[replica]
+        return super().get_bind(mapper, clause, bind, **kwargs)
+
+
+class ReplicaSQLAlchemy(SQLAlchemy):
+    def __init__(self, **kwargs):
+        kwargs.setdefault('session_options', {}).setdefault(
+            'class_', ReplicaSession
+        )
+        super().__init__(**kwargs)
+
+    def init_app(self, app):
+        uris = app.config.get('SQLALCHEMY_READ_REPLICAS') or []
+        keys = [f'{REPLICA_BIND_PREFIX}{index}' for index in range(len(uris))]
+        if keys:
+            app.config['SQLALCHEMY_BINDS'] = {
+                **app.config.get('SQLALCHEMY_BINDS', {}),
+                **dict(zip(keys, uris))
+            }
+        super().init_app(app)
+        if keys:
+            # The replicas hold copies of the primary's tables, so their
+            # binds get no metadata; otherwise create_all and drop_all
+            # would run against them, also in apps without replicas
+            for key in keys:
+                self.metadatas.pop(key, None)
+            app.extensions['read_replicas'] = ReplicaRouter(keys)
+
+
+def read_replica(view):
+    # Reads of the wrapped view go to the next replica in turn, unless the
+    # session has already written during this request
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        router = current_app.extensions.get('read_replicas')
+        session = current_app.extensions['sqlalchemy'].session
+        if router is None or session.info.get('wrote'):
+            return view(*args, **kwargs)
+        session.info['replica'] = router.choose()
+        try:
+            return view(*args, **kwargs)
+        finally:
+            session.info.pop('replica', None)
+    return wrapper
@@ -1,60 +1,197 @@
+import base64
+import csv
+import hashlib
+import io
+import json
 from flask import Blueprint, render_template, request, redirect, url_for, flash
-from flask import jsonify
-from models import db, Warehouse, Item
+from flask import abort, jsonify, Response, stream_with_context
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.exc import StaleDataError
+from cache import cached_json
+from changes import record_change, record_item_deletes
+import encoding
+from models import db, Warehouse, Item, touch_warehouse
+from replicas import read_replica
+from importer import insert_items, read_rows, request_text
+from search import name_search
+from summary import summary_enabled, warehouse_stats_query
+from validation import parse_capacity, parse_quantity, validate_item
+from stock import add_stock, take_stock, fit_new_stock, lock_warehouses
 
 warehouse_bp = Blueprint('warehouse', __name__)
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+BULK_CHUNK_SIZE = 5000
+EXPORT_BATCH_SIZE = 1000
+ITEM_COLUMNS = ('id', 'name', 'quantity', 'warehouse_id')
+ITEM_SORTS = {'id': Item.id, 'name': Item.name, 'quantity': Item.quantity}
+CONFLICT_ERROR = 'Modified by another request, reload and retry'
+EXPORT_COLUMNS = (
+    'warehouse_id', 'warehouse_name', 'location',
+    'item_id', 'item_name', 'quantity'
+)
+
+
+def _int_arg(name, default, maximum=None):
+    try:
+        value = int(request.args.get(name, default))
+    except (ValueError, TypeError):
+        value = default
+    value = max(0, value)
+    if maximum is not None:
+        value = min(value, maximum)
+    return value
+
+
+def _warehouse_etag(warehouse_id, version, revision):
+    return f'warehouse-{warehouse_id}-{version}.{revision}'
+
+
+def _item_etag(item):
+    return f'item-{item.id}-{item.version}'
+
+
+def _precondition_failed(etag):
+    # If-Match is optional; without it the version check still applies
+    return bool(request.if_match) and etag not in request.if_match
+
+
+def _warehouse_precondition_failed(warehouse):
+    # Stock changes only move the revision part of the ETag, so an edit
+    # made against an older revision of the same version still applies
+    if not request.if_match or request.if_match.star_tag:
+        return False
+    prefix = f'warehouse-{warehouse.id}-{warehouse.version}.'
+    return not any(etag.startswith(prefix) for etag in request.if_match)
+
+
+def _flush_versioned():
+    try:
+        db.session.flush()
+    except StaleDataError:
+        db.session.rollback()
+        return False
+    return True
+
 
 @warehouse_bp.route('/')
+@read_replica
 def index():
-    warehouses = Warehouse.query.all()
-    return render_template('index.html', warehouses=warehouses)
+    rows = warehouse_stats_query().order_by(Warehouse.id).all()
+    return render_template('index.html', warehouses=rows)
 
 
 @warehouse_bp.route('/warehouses', methods=['GET'])
+@read_replica
 def list_warehouses():
-    warehouses = Warehouse.query.all()
-    return jsonify([w.to_dict() for w in warehouses])
+    after = _int_arg('after', 0)
+    limit = _int_arg('limit', DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    include_items = 'items' in request.args.get('include', '').split(',')
+
+    rows = db.session.execute(
+        select(Warehouse.id, Warehouse.revision)
+        .where(Warehouse.id > after).order_by(Warehouse.id).limit(limit + 1)
+    ).all()
+    page = [tuple(row) for row in rows[:limit]]
+    digest = hashlib.sha1(repr((include_items, page)).encode()).hexdigest()
+
+    def build():
+        query = Warehouse.query.filter(
+            Warehouse.id.in_([warehouse_id for warehouse_id, _ in page])
+        ).order_by(Warehouse.id)
+        if include_items:
+            query = query.options(selectinload(Warehouse.items))
+        return [w.to_dict(include_items) for w in query]
+
+    response = cached_json(f'list-{digest}', build)
+    if len(rows) > limit and page:
+        response.headers['X-Next-After'] = str(page[-1][0])
+    return response
+
+
+@warehouse_bp.route('/warehouses/summary', methods=['GET'])
+def warehouse_summary():
+    after = _int_arg('after', 0)
+    limit = _int_arg('limit', DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+    rows = warehouse_stats_query().filter(Warehouse.id > after) \
+        .order_by(Warehouse.id).limit(limit + 1).all()
+
+    page = rows[:limit]
+    response = jsonify([{
+        'id': warehouse.id,
+        'name': warehouse.name,
+        'item_count': item_count,
+        'total_quantity': total_quantity,
+        'distinct_item_names': distinct_item_names
+    } for warehouse, item_count, total_quantity, distinct_item_names in page])
+    if len(rows) > limit and page:
+        response.headers['X-Next-After'] = str(page[-1][0].id)
+    return response
 
 
 @warehouse_bp.route('/warehouses/<int:warehouse_id>', methods=['GET'])
+@read_replica
 def get_warehouse(warehouse_id):
-    warehouse = Warehouse.query.get_or_404(warehouse_id)
-    return jsonify(warehouse.to_dict())
+    row = db.session.execute(
+        select(Warehouse.version, Warehouse.revision)
+        .where(Warehouse.id == warehouse_id)
+    ).first()
+    if row is None:
+        abort(404)
+    return cached_json(
+        _warehouse_etag(warehouse_id, *row),
+        lambda: db.session.get(Warehouse, warehouse_id).to_dict()
+    )
+
+
+def _commit_unique_name(warehouse, action):
+    try:
+        db.session.flush()
+        record_change('warehouse', action, warehouse.id, warehouse.id,
+                      warehouse.to_dict(include_items=False))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return 'Warehouse name already exists', 400
+    except StaleDataError:
+        db.session.rollback()
+        return CONFLICT_ERROR, 409
+    return None, None
 
 
 @warehouse_bp.route('/warehouses', methods=['POST'])
 def create_warehouse():
-    if request.is_json:
-        data = request.get_json()
-        name = data.get('name')
-        location = data.get('location', '')
-        description = data.get('description', '')
-    else:
-        name = request.form.get('name')
-        location = request.form.get('location', '')
-        description = request.form.get('description', '')
+    data = request.get_json() if request.is_json else request.form
+    name = data.get('name')
+    location = data.get('location', '')
+    description = data.get('description', '')
 
+    capacity, error = parse_capacity(data.get('capacity'))
     if not name or not name.strip():
+        error = 'Name is required'
+    if error:
         if request.is_json:
-            return jsonify({'error': 'Name is required'}), 400
-        flash('Name is required', 'error')
-        return redirect(url_for('warehouse.index'))
-
-    existing = Warehouse.query.filter_by(name=name.strip()).first()
-    if existing:
-        if request.is_json:
-            return jsonify({'error': 'Warehouse name already exists'}), 400
-        flash('Warehouse name already exists', 'error')
+            return jsonify({'error': error}), 400
+        flash(error, 'error')
         return redirect(url_for('warehouse.index'))
 
     warehouse = Warehouse(
         name=name.strip(),
         location=location.strip() if location else '',
-        description=description.strip() if description else ''
+        description=description.strip() if description else '',
+        capacity=capacity
     )
     db.session.add(warehouse)
-    db.session.commit()
+    error, status = _commit_unique_name(warehouse, 'create')
+    if error:
+        if request.is_json:
+            return jsonify({'error': error}), status
+        flash(error, 'error')
+        return redirect(url_for('warehouse.index'))
 
     if request.is_json:
         return jsonify(warehouse.to_dict()), 201
@@ -66,15 +203,14 @@ def create_warehouse():
 @warehouse_bp.route('/warehouses/<int:warehouse_id>', methods=['PUT'])
 def update_warehouse(warehouse_id):
     warehouse = Warehouse.query.get_or_404(warehouse_id)
+    if _warehouse_precondition_failed(warehouse):
+        return jsonify({'error': CONFLICT_ERROR}), 412
     data = request.get_json()
 
     if 'name' in data:
         new_name = data['name'].strip() if data['name'] else ''
         if not new_name:
             return jsonify({'error': 'Name cannot be empty'}), 400
-        existing = Warehouse.query.filter_by(name=new_name).first()
-        if existing and existing.id != warehouse_id:
-            return jsonify({'error': 'Warehouse name already exists'}), 400
         warehouse.name = new_name
 
     if 'location' in data:
@@ -85,8 +221,20 @@ def update_warehouse(warehouse_id):
         warehouse.description = data['description'].strip() \
             if data['description'] else ''
 
-    db.session.commit()
-    return jsonify(warehouse.to_dict())
+    if 'capacity' in data:
+        capacity, error = parse_capacity(data['capacity'])
+        if error:
+            return jsonify({'error': error}), 400
+        warehouse.capacity = capacity
+
+    error, status = _commit_unique_name(warehouse, 'update')
+    if error:
+        return jsonify({'error': error}), status
+    response = jsonify(warehouse.to_dict())
+    response.set_etag(_warehouse_etag(
+        warehouse.id, warehouse.version, warehouse.revision
+    ))
+    return response
 
 
 @warehouse_bp.route(
@@ -101,15 +249,14 @@ def edit_warehouse(warehouse_id):
         location = request.form.get('location', '')
         description = request.form.get('description', '')
 
+        error = None
         if not name or not name.strip():
-            flash('Name is required', 'error')
-            return render_template(
-                'edit_warehouse.html', warehouse=warehouse
-            )
-
-        existing = Warehouse.query.filter_by(name=name.strip()).first()
-        if existing and existing.id != warehouse_id:
-            flash('Warehouse name already exists', 'error')
+            error = 'Name is required'
+        elif request.form.get('version', str(warehouse.version)) != \
+                str(warehouse.version):
+            error = CONFLICT_ERROR
+        if error:
+            flash(error, 'error')
             return render_template(
                 'edit_warehouse.html', warehouse=warehouse
             )
@@ -117,7 +264,13 @@ def edit_warehouse(warehouse_id):
         warehouse.name = name.strip()
         warehouse.location = location.strip() if location else ''
         warehouse.description = description.strip() if description else ''
-        db.session.commit()
+        error, _ = _commit_unique_name(warehouse, 'update')
+        if error:
+            flash(error, 'error')
+            return render_template(
+                'edit_warehouse.html',
+                warehouse=db.session.get(Warehouse, warehouse_id)
+            )
 
         flash('Warehouse updated successfully', 'success')
         return redirect(url_for('warehouse.index'))
@@ -125,11 +278,26 @@ def edit_warehouse(warehouse_id):
     return render_template('edit_warehouse.html', warehouse=warehouse)
 
 
+def _delete_warehouse(warehouse):
+    # The cascade deletes the items too; the feed gets a delete for each
+    # of them before the warehouse's own
+    item_ids = [item.id for item in warehouse.items]
+    db.session.delete(warehouse)
+    if not _flush_versioned():
+        return False
+    record_item_deletes(item_ids, warehouse.id)
+    record_change('warehouse', 'delete', warehouse.id, warehouse.id)
+    db.session.commit()
+    return True
+
+
 @warehouse_bp.route('/warehouses/<int:warehouse_id>', methods=['DELETE'])
 def delete_warehouse(warehouse_id):
     warehouse = Warehouse.query.get_or_404(warehouse_id)
-    db.session.delete(warehouse)
-    db.session.commit()
+    if _warehouse_precondition_failed(warehouse):
+        return jsonify({'error': CONFLICT_ERROR}), 412
+    if not _delete_warehouse(warehouse):
+        return jsonify({'error': CONFLICT_ERROR}), 409
     return jsonify({'message': 'Warehouse deleted successfully'}), 200
 
 
@@ -139,8 +307,9 @@ def delete_warehouse(warehouse_id):
 )
 def delete_warehouse_form(warehouse_id):
     warehouse = Warehouse.query.get_or_404(warehouse_id)
-    db.session.delete(warehouse)
-    db.session.commit()
+    if not _delete_warehouse(warehouse):
+        flash(CONFLICT_ERROR, 'error')
+        return redirect(url_for('warehouse.index'))
     flash('Warehouse deleted successfully', 'success')
     return redirect(url_for('warehouse.index'))
 
@@ -160,29 +329,20 @@ def add_item(warehouse_id):
         name = request.form.get('name')
         quantity = request.form.get('quantity', 0.0)
 
-    if not name or not str(name).strip():
-        if request.is_json:
-            return jsonify({'error': 'Item name is required'}), 400
-        flash('Item name is required', 'error')
-        return redirect(url_for('warehouse.view_warehouse', w_id=warehouse_id))
-
-    try:
-        quantity = float(quantity)
-    except (ValueError, TypeError):
-        quantity = 0.0
-
-    if quantity < 0:
+    values, error = validate_item(name, quantity)
+    if error:
         if request.is_json:
-            return jsonify({'error': 'Quantity cannot be negative'}), 400
-        flash('Quantity cannot be negative', 'error')
+            return jsonify({'error': error}), 400
+        flash(error, 'error')
         return redirect(url_for('warehouse.view_warehouse', w_id=warehouse_id))
 
-    item = Item(
-        name=str(name).strip(),
-        quantity=quantity,
-        warehouse_id=warehouse.id
-    )
+    lock_warehouses([warehouse.id])
+    item = Item(warehouse_id=warehouse.id,
+                **fit_new_stock(warehouse.id, [values])[0])
     db.session.add(item)
+    db.session.flush()
+    record_change('item', 'create', item.id, warehouse.id, item.to_dict())
+    touch_warehouse(warehouse.id)
     db.session.commit()
 
     if request.is_json:
@@ -192,6 +352,220 @@ def add_item(warehouse_id):
     return redirect(url_for('warehouse.view_warehouse', w_id=warehouse_id))
 
 
+def _encode_cursor(sort, row):
+    if sort == 'id':
+        return str(row[0])
+    return base64.urlsafe_b64encode(
+        json.dumps([row[ITEM_COLUMNS.index(sort)], row[0]]).encode()
+    ).decode()
+
+
+def _decode_cursor(sort, cursor):
+    if sort == 'id':
+        return (int(cursor),)
+    value, item_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError('Invalid cursor value')
+    return value, int(item_id)
+
+
+def _item_page(warehouse_id, sort, cursor, limit):
+    descending = sort.startswith('-')
+    sort = sort.lstrip('-')
+    columns = (ITEM_SORTS[sort], Item.id) if sort != 'id' else (Item.id,)
+    query = Item.query.with_entities(
+        Item.id, Item.name, Item.quantity, Item.warehouse_id
+    ).filter(Item.warehouse_id == warehouse_id)
+    if cursor:
+        key, after = tuple_(*columns), tuple_(*_decode_cursor(sort, cursor))
+        query = query.filter(key < after if descending else key > after)
+    order = [c.desc() if descending else c for c in columns]
+    rows = query.order_by(*order).limit(limit + 1).all()
+    next_cursor = _encode_cursor(sort, rows[limit - 1]) \
+        if len(rows) > limit and limit else None
+    return [dict(zip(ITEM_COLUMNS, row)) for row in rows[:limit]], next_cursor
+
+
+@warehouse_bp.route(
+    '/warehouses/<int:warehouse_id>/items',
+    methods=['GET']
+)
+def list_items(warehouse_id):
+    sort = request.args.get('sort', 'id')
+    if sort.lstrip('-') not in ITEM_SORTS:
+        return jsonify({'error': 'Unsupported sort'}), 400
+    cursor = request.args.get('after', '')
+    limit = _int_arg('limit', DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    revision = db.session.execute(
+        select(Warehouse.revision).where(Warehouse.id == warehouse_id)
+    ).scalar()
+    if revision is None:
+        abort(404)
+
+    try:
+        items, next_cursor = _item_page(warehouse_id, sort, cursor, limit)
+    except (ValueError, TypeError):
+        return jsonify({'error': 'Invalid cursor'}), 400
+    response = Response(encoding.dumps(items), mimetype='application/json')
+    response.set_etag(
+        f'items-{warehouse_id}-{revision}-{sort}-{cursor}-{limit}'
+    )
+    if next_cursor:
+        response.headers['X-Next-After'] = next_cursor
+    return response.make_conditional(request)
+
+
+def _stock_amount():
+    data = request.get_json(silent=True) or {}
+    try:
+        return float(data.get('amount', 0.0))
+    except (ValueError, TypeError):
+        return None
+
+
+@warehouse_bp.route(
+    '/warehouses/<int:warehouse_id>/items/<int:item_id>/add',
+    methods=['POST']
+)
+def add_item_stock(warehouse_id, item_id):
+    amount = _stock_amount()
+    if amount is None:
+        return jsonify({'error': 'Amount must be a number'}), 400
+
+    quantity = add_stock(warehouse_id, item_id, amount)
+    if quantity is None:
+        db.session.rollback()
+        return jsonify({'error': 'Item not found'}), 404
+
+    record_change('item', 'update', item_id, warehouse_id,
+                  {'id': item_id, 'quantity': quantity})
+    touch_warehouse(warehouse_id)
+    db.session.commit()
+    return jsonify({'id': item_id, 'quantity': quantity})
+
+
+@warehouse_bp.route(
+    '/warehouses/<int:warehouse_id>/items/<int:item_id>/take',
+    methods=['POST']
+)
+def take_item_stock(warehouse_id, item_id):
+    amount = _stock_amount()
+    if amount is None:
+        return jsonify({'error': 'Amount must be a number'}), 400
+
+    try:
+        result = take_stock(warehouse_id, item_id, amount)
+    except RuntimeError as error:
+        db.session.rollback()
+        return jsonify({'error': str(error)}), 409
+    if result is None:
+        db.session.rollback()
+        return jsonify({'error': 'Item not found'}), 404
+
+    taken, quantity = result
+    record_change('item', 'update', item_id, warehouse_id,
+                  {'id': item_id, 'quantity': quantity})
+    touch_warehouse(warehouse_id)
+    db.session.commit()
+    return jsonify({'id': item_id, 'quantity': quantity, 'taken': taken})
+
+
+def _bulk_rows():
+    if request.mimetype == 'application/x-ndjson':
+        return read_rows(request_text(request.stream), 'ndjson')
+    data = request.get_json(silent=True)
+    return data if isinstance(data, list) else None
+
+
+@warehouse_bp.route(
+    '/warehouses/<int:warehouse_id>/items:bulk',
+    methods=['POST']
+)
+def add_items_bulk(warehouse_id):
+    warehouse = Warehouse.query.get_or_404(warehouse_id)
+
+    bulk_rows = _bulk_rows()
+    if bulk_rows is None:
+        return jsonify({'error': 'Expected a list of items'}), 400
+
+    lock_warehouses([warehouse.id])
+    rows = []
+    errors = []
+    inserted = 0
+    for row, data in enumerate(bulk_rows):
+        if not isinstance(data, dict):
+            errors.append({'row': row, 'error': 'Invalid row'})
+            continue
+        values, error = validate_item(
+            data.get('name'), data.get('quantity', 0.0)
+        )
+        if error:
+            errors.append({'row': row, 'error': error})
+            continue
+        values['warehouse_id'] = warehouse.id
+        rows.append(values)
+        if len(rows) >= BULK_CHUNK_SIZE:
+            inserted += insert_items(fit_new_stock(warehouse.id, rows))
+
+    inserted += insert_items(fit_new_stock(warehouse.id, rows))
+    touch_warehouse(warehouse.id)
+    db.session.commit()
+
+    return jsonify({'inserted': inserted, 'errors': errors}), 201
+
+
+def _item_or_404(warehouse_id, item_id):
+    return Item.query.filter_by(
+        id=item_id, warehouse_id=warehouse_id
+    ).first_or_404()
+
+
+def _item_response(item):
+    response = jsonify(item.to_dict())
+    response.set_etag(_item_etag(item))
+    return response
+
+
+@warehouse_bp.route(
+    '/warehouses/<int:warehouse_id>/items/<int:item_id>',
+    methods=['GET']
+)
+def get_item(warehouse_id, item_id):
+    item = _item_or_404(warehouse_id, item_id)
+    return _item_response(item).make_conditional(request)
+
+
+@warehouse_bp.route(
+    '/warehouses/<int:warehouse_id>/items/<int:item_id>',
+    methods=['PUT']
+)
+def update_item(warehouse_id, item_id):
+    item = _item_or_404(warehouse_id, item_id)
+    if _precondition_failed(_item_etag(item)):
+        return jsonify({'error': CONFLICT_ERROR}), 412
+    data = request.get_json(silent=True) or {}
+    # Unlike on create, an unreadable quantity must not become 0 here
+    quantity, error = parse_quantity(data.get('quantity', item.quantity))
+    if error:
+        return jsonify({'error': error}), 400
+    values, error = validate_item(data.get('name', item.name), quantity)
+    if error:
+        return jsonify({'error': error}), 400
+
+    lock_warehouses([warehouse_id])
+    stocked = {'quantity': values['quantity'] - item.quantity}
+    if stocked['quantity'] > 0:
+        fit_new_stock(warehouse_id, [stocked])
+    item.name = values['name']
+    item.quantity += stocked['quantity']
+    if not _flush_versioned():
+        return jsonify({'error': CONFLICT_ERROR}), 409
+    record_change('item', 'update', item.id, warehouse_id, item.to_dict())
+    touch_warehouse(warehouse_id)
+    db.session.commit()
+    return _item_response(item)
+
+
 @warehouse_bp.route(
     '/warehouses/<int:warehouse_id>/items/<int:item_id>',
     methods=['DELETE']
@@ -202,8 +576,14 @@ def remove_item(warehouse_id, item_id):
     ).first()
     if not item:
         return jsonify({'error': 'Item not found'}), 404
+    if _precondition_failed(_item_etag(item)):
+        return jsonify({'error': CONFLICT_ERROR}), 412
 
     db.session.delete(item)
+    if not _flush_versioned():
+        return jsonify({'error': CONFLICT_ERROR}), 409
+    record_change('item', 'delete', item_id, warehouse_id)
+    touch_warehouse(warehouse_id)
     db.session.commit()
     return jsonify({'message': 'Item removed successfully'}), 200
 
@@ -221,12 +601,113 @@ def remove_item_form(warehouse_id, item_id):
         return redirect(url_for('warehouse.view_warehouse', w_id=warehouse_id))
 
     db.session.delete(item)
+    if not _flush_versioned():
+        flash(CONFLICT_ERROR, 'error')
+        return redirect(url_for('warehouse.view_warehouse', w_id=warehouse_id))
+    record_change('item', 'delete', item_id, warehouse_id)
+    touch_warehouse(warehouse_id)
     db.session.commit()
     flash('Item removed successfully', 'success')
     return redirect(url_for('warehouse.view_warehouse', w_id=warehouse_id))
 
 
 @warehouse_bp.route('/warehouses/<int:w_id>/view')
+@read_replica
 def view_warehouse(w_id):
     warehouse = Warehouse.query.get_or_404(w_id)
-    return render_template('view_warehouse.html', warehouse=warehouse)
+    after = _int_arg('after', 0)
+    limit = _int_arg('limit', DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+    items = Item.query.filter(
+        Item.warehouse_id == w_id, Item.id > after
+    ).order_by(Item.id).limit(limit + 1).all()
+    if summary_enabled():
+        item_count = warehouse.item_count
+    else:
+        item_count = db.session.query(func.count(Item.id)) \
+            .filter(Item.warehouse_id == w_id).scalar()
+
+    page = items[:limit]
+    next_after = page[-1].id if len(items) > limit and page else None
+    return render_template(
+        'view_warehouse.html', warehouse=warehouse, items=page,
+        item_count=item_count, next_after=next_after
+    )
+
+
+def _item_filters():
+    args = request.args
+    filters = []
+    if args.get('name'):
+        filters.append(Item.name == args['name'])
+    if args.get('name_prefix'):
+        filters.append(name_search(args['name_prefix'], prefix=True))
+    if args.get('name_contains'):
+        filters.append(name_search(args['name_contains']))
+    if args.get('min_qty'):
+        filters.append(Item.quantity >= float(args['min_qty']))
+    if args.get('max_qty'):
+        filters.append(Item.quantity <= float(args['max_qty']))
+    if args.get('warehouse_id'):
+        filters.append(Item.warehouse_id == int(args['warehouse_id']))
+    return filters
+
+
+@warehouse_bp.route('/items', methods=['GET'])
+def search_items():
+    try:
+        filters = _item_filters()
+    except ValueError:
+        return jsonify({'error': 'Invalid filter value'}), 400
+    after = _int_arg('after', 0)
+    limit = _int_arg('limit', DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+    items = Item.query.filter(Item.id > after, *filters) \
+        .order_by(Item.id).limit(limit + 1).all()
+
+    page = items[:limit]
+    response = jsonify([item.to_dict() for item in page])
+    if len(items) > limit and page:
+        response.headers['X-Next-After'] = str(page[-1].id)
+    return response
+
+
+def _export_rows():
+    return db.session.query(
+        Warehouse.id, Warehouse.name, Warehouse.location,
+        Item.id, Item.name, Item.quantity
+    ).outerjoin(Item, Item.warehouse_id == Warehouse.id) \
+        .order_by(Warehouse.id, Item.id) \
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+
+def _export_ndjson():
+    for row in _export_rows():
+        yield json.dumps(dict(zip(EXPORT_COLUMNS, row))) + '\n'
+
+
+def _csv_line(row):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(row)
+    return buffer.getvalue()
+
+
+def _export_csv():
+    yield _csv_line(EXPORT_COLUMNS)
+    for row in _export_rows():
+        yield _csv_line(row)
+
+
+@warehouse_bp.route('/export')
+def export_inventory():
+    export_format = request.args.get('format', 'ndjson')
+    if export_format == 'csv':
+        return Response(
+            stream_with_context(_export_csv()), mimetype='text/csv'
+        )
+    if export_format == 'ndjson':
+        return Response(
+            stream_with_context(_export_ndjson()),
+            mimetype='application/x-ndjson'
+        )
+    return jsonify({'error': 'Unsupported export format'}), 400
@@ -0,0 +1,118 @@
+import hashlib
+from sqlalchemy import MetaData, delete, inspect, insert, select
+from sqlalchemy.schema import CreateIndex, CreateTable
+from models import db
+
+schema_version = db.Table(
+    'schema_version',
+    db.Column('fingerprint', db.String(40), primary_key=True)
+)
+
+_fingerprints = {}
+
+
+def _fingerprint(dialect):
+    digest = hashlib.sha1()
+    for table in db.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect))
+                      .encode())
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect))
+                          .encode())
+    return digest.hexdigest()
+
+
+def schema_fingerprint(dialect):
+    if dialect.name not in _fingerprints:
+        _fingerprints[dialect.name] = _fingerprint(dialect)
+    return _fingerprints[dialect.name]
+
+
+def _stored_fingerprint(connection):
+    if not inspect(connection).has_table(schema_version.name):
+        return None
+    return connection.execute(select(schema_version.c.fingerprint)).scalar()
+
+
+def _add_column(connection, table, column):
+    column_type = column.type.compile(dialect=connection.dialect)
+    ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+    if column.server_default is not None:
+        ddl += f' DEFAULT {column.server_default.arg}'
+    elif not column.nullable:
+        raise RuntimeError(
+            f'Cannot add NOT NULL column {table.name}.{column.name} '
+            'without a server default'
+        )
+    connection.exec_driver_sql(ddl)
+
+
+def _needs_autoincrement(connection, table):
+    if connection.dialect.name != 'sqlite' \
+            or not table.dialect_options['sqlite']['autoincrement']:
+        return False
+    sql = connection.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (table.name,)
+    ).scalar()
+    return 'AUTOINCREMENT' not in sql.upper()
+
+
+def _rebuild_table(connection, table):
+    # SQLite cannot alter a table's primary key, so the table is copied into
+    # a new one. Its triggers go with the old table; init_search,
+    # init_summary and init_ledger put them back after the upgrade.
+    triggers = connection.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+        "AND tbl_name = ?", (table.name,)
+    ).scalars().all()
+    for name in triggers:
+        connection.exec_driver_sql(f'DROP TRIGGER {name}')
+    metadata = MetaData()
+    for referred in {key.column.table for key in table.foreign_keys}:
+        referred.to_metadata(metadata)
+    rebuilt = table.to_metadata(metadata, name=f'_{table.name}_rebuild')
+    connection.execute(CreateTable(rebuilt))
+    columns = ', '.join(column.name for column in table.columns)
+    connection.exec_driver_sql(
+        f'INSERT INTO {rebuilt.name} ({columns}) '
+        f'SELECT {columns} FROM {table.name}'
+    )
+    connection.exec_driver_sql(f'DROP TABLE {table.name}')
+    connection.exec_driver_sql(
+        f'ALTER TABLE {rebuilt.name} RENAME TO {table.name}'
+    )
+
+
+def _upgrade_table(connection, table):
+    inspector = inspect(connection)
+    columns = {c['name'] for c in inspector.get_columns(table.name)}
+    for column in table.columns:
+        if column.name not in columns:
+            _add_column(connection, table, column)
+    if _needs_autoincrement(connection, table):
+        _rebuild_table(connection, table)
+    for index in table.indexes:
+        index.create(connection, checkfirst=True)
+
+
+def upgrade_schema():
+    # Brings databases created by older versions up to date: creates missing
+    # tables and adds missing columns and indexes. Only additive changes,
+    # apart from SQLite tables rebuilt to switch on AUTOINCREMENT.
+    # A database already synced to these models is left alone, so workers
+    # booting against it skip the table and column introspection; the
+    # trigger setup in init_search, init_summary and init_ledger still
+    # checks the database on every boot.
+    with db.engine.begin() as connection:
+        fingerprint = schema_fingerprint(connection.dialect)
+        if _stored_fingerprint(connection) == fingerprint:
+            return False
+        existing = set(inspect(connection).get_table_names())
+        db.metadata.create_all(connection)
+        for table in db.metadata.sorted_tables:
+            if table.name in existing:
+                _upgrade_table(connection, table)
+        connection.execute(delete(schema_version))
+        connection.execute(insert(schema_version), {'fingerprint': fingerprint})
+    return True
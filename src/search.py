@@ -0,0 +1,68 @@
+from flask import current_app
+from sqlalchemy import literal_column, select, table
+from sqlalchemy.exc import OperationalError
+from models import db, Item
+
+FTS_TABLE = 'items_fts'
+
+_FTS_SCHEMA = (
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    "name, content='items', content_rowid='id', tokenize='trigram')",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+
+_FTS_TRIGGERS = (
+    f"""CREATE TRIGGER IF NOT EXISTS items_fts_insert AFTER INSERT ON items
+    BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS items_fts_delete AFTER DELETE ON items
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name)
+        VALUES ('delete', old.id, old.name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS items_fts_update
+    AFTER UPDATE OF name ON items
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name)
+        VALUES ('delete', old.id, old.name);
+        INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.name);
+    END""",
+)
+
+
+def init_search(app):
+    # Keeps a trigram FTS5 index of item names in sync through triggers.
+    # Without SQLite FTS5 the name search falls back to plain LIKE.
+    enabled = False
+    if db.engine.dialect.name == 'sqlite':
+        try:
+            with db.engine.begin() as connection:
+                if not db.inspect(connection).has_table(FTS_TABLE):
+                    for statement in _FTS_SCHEMA:
+                        connection.exec_driver_sql(statement)
+                for statement in _FTS_TRIGGERS:
+                    connection.exec_driver_sql(statement)
+            enabled = True
+        except OperationalError:
+            enabled = False
+    app.extensions['item_search_fts'] = enabled
+
+
+def _like_pattern(term, prefix):
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%') \
+        .replace('_', '\\_')
+    escape = '\\' if escaped != term else None
+    return (escaped + '%' if prefix else f'%{escaped}%'), escape
+
+
+def name_search(term, prefix=False):
+    # The trigram index is only used when the pattern has no ESCAPE clause,
+    # so ordinary terms stay indexed and only terms with wildcards scan.
+    pattern, escape = _like_pattern(term, prefix)
+    if not current_app.extensions.get('item_search_fts'):
+        return Item.name.like(pattern, escape=escape)
+    name = literal_column('name')
+    matches = select(literal_column('rowid')).select_from(table(FTS_TABLE)) \
+        .where(name.like(pattern, escape=escape))
+    return Item.id.in_(matches)
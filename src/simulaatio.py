@@ -0,0 +1,156 @@
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from varasto import Varasto
+
+# Skenaario on joukko varastoja ja niihin kohdistuvat tapahtumat järjestyksessä.
+# Tapahtuma on (varaston indeksi, etumerkillinen määrä): positiivinen lisää,
+# negatiivinen ottaa, kuten varasto.toista.
+#
+# JSON: [{"nimi": "a", "varastot": [{"tilavuus": 10, "alku_saldo": 2}],
+#         "tapahtumat": [[0, 5], [0, -8]]}]
+# CSV:  skenaario,varasto,tilavuus,alku_saldo,maara
+#       varasto määritellään ensimmäisellä rivillään, tyhjä maara ei ole
+#       tapahtuma
+
+MITTARIT = ("lisatty", "ylivuoto", "pyydetty", "saatu", "loppuunmyynnit")
+
+
+def _skenaario(nimi, varastot, tapahtumat):
+    return {
+        "nimi": str(nimi),
+        "varastot": [(float(t), float(a)) for t, a in varastot],
+        "tapahtumat": [(int(i), float(m)) for i, m in tapahtumat],
+    }
+
+
+def lue_json(tiedosto):
+    return [
+        _skenaario(
+            s.get("nimi", indeksi),
+            [(v["tilavuus"], v.get("alku_saldo", 0.0)) for v in s["varastot"]],
+            s.get("tapahtumat", []),
+        )
+        for indeksi, s in enumerate(json.load(tiedosto))
+    ]
+
+
+def lue_csv(tiedosto):
+    skenaariot = {}
+    for rivi in csv.DictReader(tiedosto):
+        skenaario = skenaariot.setdefault(
+            rivi["skenaario"], {"varastot": {}, "tapahtumat": []}
+        )
+        varastot = skenaario["varastot"]
+        if rivi["varasto"] not in varastot:
+            varastot[rivi["varasto"]] = (
+                len(varastot), rivi["tilavuus"], rivi.get("alku_saldo") or 0
+            )
+        if rivi.get("maara"):
+            skenaario["tapahtumat"].append(
+                (varastot[rivi["varasto"]][0], rivi["maara"])
+            )
+    return [
+        _skenaario(
+            nimi, [(t, a) for _, t, a in s["varastot"].values()],
+            s["tapahtumat"]
+        )
+        for nimi, s in skenaariot.items()
+    ]
+
+
+def lue(polku):
+    lukija = lue_csv if polku.lower().endswith(".csv") else lue_json
+    with open(polku, newline="", encoding="utf-8") as tiedosto:
+        return lukija(tiedosto)
+
+
+def _tayttoaste(saatu, pyydetty):
+    return saatu / pyydetty if pyydetty else 1.0
+
+
+def simuloi(skenaario):
+    varastot = [Varasto(t, a) for t, a in skenaario["varastot"]]
+    tulos = dict.fromkeys(MITTARIT, 0.0)
+    tulos["loppuunmyynnit"] = 0
+    for indeksi, maara in skenaario["tapahtumat"]:
+        varasto = varastot[indeksi]
+        if maara >= 0:
+            mahtuu = varasto.paljonko_mahtuu()
+            tulos["lisatty"] += min(maara, mahtuu)
+            tulos["ylivuoto"] += max(0.0, maara - mahtuu)
+            varasto.lisaa_varastoon(maara)
+        else:
+            saatu = varasto.ota_varastosta(-maara)
+            tulos["pyydetty"] -= maara
+            tulos["saatu"] += saatu
+            tulos["loppuunmyynnit"] += saatu < -maara
+    tulos["tayttoaste"] = _tayttoaste(tulos["saatu"], tulos["pyydetty"])
+    tulos["nimi"] = skenaario["nimi"]
+    tulos["saldot"] = [v.saldo for v in varastot]
+    return tulos
+
+
+def _simuloi_pala(pala):
+    return [simuloi(skenaario) for skenaario in pala]
+
+
+def yhdista(tulokset):
+    yhteensa = dict.fromkeys(MITTARIT, 0.0)
+    yhteensa["loppuunmyynnit"] = 0
+    for tulos in tulokset:
+        for mittari in MITTARIT:
+            yhteensa[mittari] += tulos[mittari]
+    yhteensa["skenaarioita"] = len(tulokset)
+    yhteensa["tayttoaste"] = _tayttoaste(
+        yhteensa["saatu"], yhteensa["pyydetty"]
+    )
+    return yhteensa
+
+
+def aja(skenaariot, prosesseja=None, palan_koko=None):
+    # Tulokset kootaan syötteen järjestyksessä, joten summat ovat samat
+    # prosessien määrästä riippumatta.
+    prosesseja = prosesseja or os.cpu_count() or 1
+    if prosesseja == 1 or len(skenaariot) < 2:
+        tulokset = _simuloi_pala(skenaariot)
+    else:
+        palan_koko = palan_koko or math.ceil(
+            len(skenaariot) / (prosesseja * 4)
+        )
+        palat = [
+            skenaariot[alku:alku + palan_koko]
+            for alku in range(0, len(skenaariot), palan_koko)
+        ]
+        with ProcessPoolExecutor(max_workers=prosesseja) as pooli:
+            tulokset = [
+                tulos for pala in pooli.map(_simuloi_pala, palat)
+                for tulos in pala
+            ]
+    return {"skenaariot": tulokset, "yhteensa": yhdista(tulokset)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Aja varastoskenaariot rinnakkain"
+    )
+    parser.add_argument("polku", help="skenaariot JSON- tai CSV-tiedostona")
+    parser.add_argument("--prosesseja", type=int, default=None)
+    parser.add_argument("--palan-koko", type=int, default=None)
+    parser.add_argument("--kaikki", action="store_true",
+                        help="tulosta myös skenaariokohtaiset tulokset")
+    args = parser.parse_args(argv)
+
+    tulokset = aja(lue(args.polku), args.prosesseja, args.palan_koko)
+    if not args.kaikki:
+        tulokset = tulokset["yhteensa"]
+    json.dump(tulokset, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.orm import aliased
+from models import db, Warehouse, Item
+from summary import summary_enabled
+
+MAX_TAKE_ATTEMPTS = 10
+
+
+def _least(first, second):
+    return case((first < second, first), else_=second)
+
+
+def _greatest(first, second):
+    return case((first > second, first), else_=second)
+
+
+def free_space(warehouse_id):
+    if summary_enabled():
+        total = Warehouse.total_quantity
+    else:
+        stocked = aliased(Item)
+        total = select(func.coalesce(func.sum(stocked.quantity), 0.0)) \
+            .where(stocked.warehouse_id == warehouse_id).scalar_subquery()
+    return select(Warehouse.capacity - total) \
+        .where(Warehouse.id == warehouse_id).scalar_subquery()
+
+
+def add_stock(warehouse_id, item_id, amount):
+    # Same clamping as Varasto.lisaa_varastoon, evaluated inside the UPDATE
+    amount = max(0.0, amount)
+    added = _greatest(_least(amount, func.coalesce(
+        free_space(warehouse_id), amount
+    )), 0.0)
+    statement = update(Item).where(
+        Item.id == item_id, Item.warehouse_id == warehouse_id
+    ).values(
+        quantity=Item.quantity + added, version=Item.version + 1
+    ).returning(Item.quantity)
+    return db.session.execute(statement).scalar()
+
+
+def _take_exact(warehouse_id, item_id, amount):
+    statement = update(Item).where(
+        Item.id == item_id, Item.warehouse_id == warehouse_id,
+        Item.quantity >= amount
+    ).values(
+        quantity=Item.quantity - amount, version=Item.version + 1
+    ).returning(Item.quantity)
+    return db.session.execute(statement).scalar()
+
+
+def _take_all(warehouse_id, item_id, seen):
+    statement = update(Item).where(
+        Item.id == item_id, Item.warehouse_id == warehouse_id,
+        Item.quantity == seen
+    ).values(quantity=0.0, version=Item.version + 1)
+    return db.session.execute(statement).rowcount == 1
+
+
+def take_stock(warehouse_id, item_id, amount):
+    # Same semantics as Varasto.ota_varastosta; a partial withdrawal
+    # empties the item with a compare-and-set on the quantity last seen
+    amount = max(0.0, amount)
+    for _ in range(MAX_TAKE_ATTEMPTS):
+        remaining = _take_exact(warehouse_id, item_id, amount)
+        if remaining is not None:
+            return amount, remaining
+        seen = db.session.execute(select(Item.quantity).where(
+            Item.id == item_id, Item.warehouse_id == warehouse_id
+        )).scalar()
+        if seen is None:
+            return None
+        if seen < amount and _take_all(warehouse_id, item_id, seen):
+            return seen, 0.0
+    raise RuntimeError('Stock is changing too fast to withdraw from')
+
+
+def lock_warehouses(warehouse_ids):
+    # Lock in ascending id order so concurrent writers queue instead of
+    # deadlocking; SQLite has no row locks, so take its write lock up front
+    connection = db.session.connection()
+    if connection.dialect.name == 'sqlite':
+        if not connection.connection.driver_connection.in_transaction:
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+        return
+    db.session.execute(
+        select(Warehouse.id).where(Warehouse.id.in_(sorted(warehouse_ids)))
+        .order_by(Warehouse.id).with_for_update()
+    ).all()
+
+
+def fit_new_stock(warehouse_id, rows):
+    # New stock is clamped to the free space in row order, like the
+    # alku_saldo of a Varasto; callers hold lock_warehouses meanwhile
+    free = db.session.execute(select(free_space(warehouse_id))).scalar()
+    if free is not None:
+        free = max(0.0, free)
+        for row in rows:
+            row['quantity'] = min(row['quantity'], free)
+            free -= row['quantity']
+    return rows
+
+
+def _item_named(warehouse_id, name):
+    return db.session.execute(
+        select(Item.id, Item.quantity).where(
+            Item.warehouse_id == warehouse_id, Item.name == name
+        ).order_by(Item.id).limit(1)
+    ).first()
+
+
+def _new_item(warehouse_id, name, quantity):
+    return db.session.execute(insert(Item).returning(Item.id), {
+        'warehouse_id': warehouse_id, 'name': name, 'quantity': quantity
+    }).scalar()
+
+
+def _put_exact(warehouse_id, item_id, amount):
+    statement = update(Item).where(
+        Item.id == item_id, Item.warehouse_id == warehouse_id,
+        func.coalesce(free_space(warehouse_id), amount) >= amount
+    ).values(
+        quantity=Item.quantity + amount, version=Item.version + 1
+    ).returning(Item.quantity)
+    return db.session.execute(statement).scalar()
+
+
+def transfer_stock(from_id, to_id, name, amount):
+    # Moves what the source has and the target can hold, like taking from
+    # one Varasto and adding to another without losing the overflow. The
+    # target item is only created once something actually moves.
+    source = _item_named(from_id, name)
+    if source is None:
+        raise LookupError('Item not found in source warehouse')
+    target = _item_named(to_id, name)
+    if target is None and db.session.execute(select(Warehouse.id).where(
+            Warehouse.id == to_id)).scalar() is None:
+        raise LookupError('Target warehouse not found')
+    free = db.session.execute(select(free_space(to_id))).scalar()
+    moved = max(0.0, min(
+        amount, source.quantity, amount if free is None else free
+    ))
+
+    source_left = source.quantity
+    target_id, target_quantity = target if target is not None else (None, 0.0)
+    if moved > 0:
+        source_left = _take_exact(from_id, source.id, moved)
+        if target is None:
+            target_id, target_quantity = _new_item(to_id, name, moved), moved
+        else:
+            target_quantity = _put_exact(to_id, target_id, moved)
+        if source_left is None or target_quantity is None:
+            raise RuntimeError('Stock changed during the transfer')
+    return {
+        'moved': moved,
+        'source': {'id': source.id, 'quantity': source_left},
+        'target': {'id': target_id, 'quantity': target_quantity,
+                   'created': target is None and target_id is not None}
+    }
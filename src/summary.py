@@ -0,0 +1,129 @@
+from flask import current_app
+from sqlalchemy import func
+from models import db, Warehouse, Item
+
+# Per-warehouse aggregates are kept on the warehouses row (item_count,
+# total_quantity, distinct_item_names) and in warehouse_item_names by
+# triggers, so ORM writes, bulk inserts and SQL-side stock updates all
+# maintain them in the statement's own transaction.
+
+_ADD_ITEM = """
+        UPDATE warehouses
+        SET item_count = item_count + 1,
+            total_quantity = total_quantity + new.quantity
+        WHERE id = new.warehouse_id;
+        INSERT INTO warehouse_item_names (warehouse_id, name, item_count)
+        VALUES (new.warehouse_id, new.name, 1)
+        ON CONFLICT (warehouse_id, name)
+        DO UPDATE SET item_count = item_count + 1;
+        UPDATE warehouses SET distinct_item_names = distinct_item_names + 1
+        WHERE id = new.warehouse_id AND (
+            SELECT item_count FROM warehouse_item_names
+            WHERE warehouse_id = new.warehouse_id AND name = new.name
+        ) = 1;
+"""
+
+_REMOVE_ITEM = """
+        UPDATE warehouses
+        SET item_count = item_count - 1,
+            total_quantity = total_quantity - old.quantity
+        WHERE id = old.warehouse_id;
+        UPDATE warehouse_item_names SET item_count = item_count - 1
+        WHERE warehouse_id = old.warehouse_id AND name = old.name;
+        UPDATE warehouses SET distinct_item_names = distinct_item_names - 1
+        WHERE id = old.warehouse_id AND (
+            SELECT item_count FROM warehouse_item_names
+            WHERE warehouse_id = old.warehouse_id AND name = old.name
+        ) = 0;
+        DELETE FROM warehouse_item_names
+        WHERE warehouse_id = old.warehouse_id AND name = old.name
+            AND item_count = 0;
+"""
+
+_TRIGGERS = {
+    'items_summary_insert': f"""
+        AFTER INSERT ON items
+        BEGIN {_ADD_ITEM} END""",
+    'items_summary_delete': f"""
+        AFTER DELETE ON items
+        BEGIN {_REMOVE_ITEM} END""",
+    'items_summary_quantity': """
+        AFTER UPDATE OF quantity ON items
+        WHEN old.warehouse_id = new.warehouse_id AND old.name = new.name
+        BEGIN
+            UPDATE warehouses
+            SET total_quantity = total_quantity + new.quantity - old.quantity
+            WHERE id = new.warehouse_id;
+        END""",
+    'items_summary_move': f"""
+        AFTER UPDATE OF warehouse_id, name, quantity ON items
+        WHEN old.warehouse_id != new.warehouse_id OR old.name != new.name
+        BEGIN {_REMOVE_ITEM} {_ADD_ITEM} END""",
+}
+
+_REBUILD = (
+    'DELETE FROM warehouse_item_names',
+    """INSERT INTO warehouse_item_names (warehouse_id, name, item_count)
+    SELECT warehouse_id, name, COUNT(*) FROM items
+    GROUP BY warehouse_id, name""",
+    """UPDATE warehouses SET
+        item_count = (
+            SELECT COUNT(*) FROM items WHERE warehouse_id = warehouses.id
+        ),
+        total_quantity = (
+            SELECT COALESCE(SUM(quantity), 0) FROM items
+            WHERE warehouse_id = warehouses.id
+        ),
+        distinct_item_names = (
+            SELECT COUNT(*) FROM warehouse_item_names
+            WHERE warehouse_id = warehouses.id
+        )""",
+)
+
+
+def rebuild_summary(connection):
+    for statement in _REBUILD:
+        connection.exec_driver_sql(statement)
+
+
+def init_summary(app):
+    enabled = db.engine.dialect.name == 'sqlite'
+    if enabled:
+        with db.engine.begin() as connection:
+            existing = set(connection.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+            ).scalars())
+            missing = set(_TRIGGERS) - existing
+            for name in sorted(missing):
+                connection.exec_driver_sql(
+                    f'CREATE TRIGGER {name} {_TRIGGERS[name]}'
+                )
+            if missing:
+                rebuild_summary(connection)
+    app.extensions['warehouse_summary'] = enabled
+
+
+def summary_enabled():
+    return bool(current_app.extensions.get('warehouse_summary'))
+
+
+def warehouse_stats_query():
+    # Rows of (warehouse, item count, total quantity, distinct item names),
+    # read from the maintained aggregates when the triggers are installed
+    if summary_enabled():
+        return db.session.query(
+            Warehouse, Warehouse.item_count, Warehouse.total_quantity,
+            Warehouse.distinct_item_names
+        )
+    stats = db.session.query(
+        Item.warehouse_id,
+        func.count(Item.id).label('item_count'),
+        func.sum(Item.quantity).label('total_quantity'),
+        func.count(func.distinct(Item.name)).label('distinct_item_names')
+    ).group_by(Item.warehouse_id).subquery()
+    return db.session.query(
+        Warehouse,
+        func.coalesce(stats.c.item_count, 0),
+        func.coalesce(stats.c.total_quantity, 0.0),
+        func.coalesce(stats.c.distinct_item_names, 0)
+    ).outerjoin(stats, stats.c.warehouse_id == Warehouse.id)
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import unittest
+from async_api import AsyncReadAPI, asgi_environ
+from app import create_app
+from models import db, Warehouse
+
+
+def _call(api, method, path, headers=None, query_string=b'', **scope):
+    scope = {
+        'type': 'http', 'method': method, 'path': path,
+        'query_string': query_string, 'headers': headers or [], **scope
+    }
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(api(scope, None, send))
+    return messages[0]['status'], dict(messages[0]['headers']), \
+        messages[1]['body']
+
+
+class TestAsyncReadAPI(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'TESTING': True
+        })
+        with self.app.app_context():
+            for name in ('First', 'Second'):
+                db.session.add(Warehouse(name=name))
+            db.session.commit()
+        self.api = AsyncReadAPI(self.app, max_workers=2)
+
+    def tearDown(self):
+        self.api.executor.shutdown()
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_list_warehouses(self):
+        status, headers, body = _call(self.api, 'GET', '/warehouses',
+                                      query_string=b'limit=1')
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)[0]['name'], 'First')
+        self.assertEqual(headers[b'X-Next-After'], b'1')
+
+    def test_get_warehouse_with_etag(self):
+        _, headers, body = _call(self.api, 'GET', '/warehouses/2')
+        self.assertEqual(json.loads(body)['name'], 'Second')
+
+        status, _, body = _call(self.api, 'GET', '/warehouses/2', headers=[
+            (b'if-none-match', headers[b'ETag'])
+        ])
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b'')
+
+    def test_get_missing_warehouse(self):
+        status, _, _ = _call(self.api, 'GET', '/warehouses/99')
+        self.assertEqual(status, 404)
+
+    def test_only_read_endpoints_are_served(self):
+        self.assertEqual(_call(self.api, 'POST', '/warehouses')[0], 404)
+        self.assertEqual(_call(self.api, 'GET', '/export')[0], 404)
+
+    def test_concurrent_requests(self):
+        scope = {'type': 'http', 'method': 'GET', 'path': '/warehouses/1'}
+        statuses = []
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+
+        async def main():
+            await asyncio.gather(*(
+                self.api(scope, None, send) for _ in range(20)
+            ))
+
+        asyncio.run(main())
+        self.assertEqual(statuses, [200] * 20)
+
+    def test_lifespan(self):
+        messages = iter([
+            {'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}
+        ])
+        sent = []
+
+        async def receive():
+            return next(messages)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        asyncio.run(self.api({'type': 'lifespan'}, receive, send))
+        self.assertEqual(sent, ['lifespan.startup.complete',
+                                'lifespan.shutdown.complete'])
+
+    def test_mounted_under_root_path(self):
+        status, _, body = _call(self.api, 'GET', '/api/warehouses/1',
+                                root_path='/api')
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)['name'], 'First')
+
+    def test_websocket_is_refused(self):
+        sent = []
+
+        async def send(message):
+            sent.append(message['type'])
+
+        asyncio.run(self.api({'type': 'websocket', 'path': '/'}, None, send))
+        self.assertEqual(sent, ['websocket.close'])
+
+    def test_unknown_scope_type(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(self.api({'type': 'other'}, None, None))
+
+
+class TestAsgiEnviron(unittest.TestCase):
+    def test_scope_is_mapped(self):
+        environ = asgi_environ({
+            'type': 'http', 'method': 'GET', 'http_version': '2',
+            'scheme': 'https', 'path': '/api/warehouses/ä',
+            'root_path': '/api', 'query_string': b'limit=1',
+            'server': ('example.com', 443), 'client': ('10.0.0.1', 5000),
+            'headers': [(b'host', b'example.com'), (b'cookie', b'a=1'),
+                        (b'cookie', b'b=2'), (b'content-type', b'text/plain')]
+        })
+        self.assertEqual(environ['SCRIPT_NAME'], '/api')
+        self.assertEqual(environ['PATH_INFO'],
+                         '/warehouses/ä'.encode().decode('latin-1'))
+        self.assertEqual(environ['QUERY_STRING'], 'limit=1')
+        self.assertEqual(environ['wsgi.url_scheme'], 'https')
+        self.assertEqual(environ['SERVER_PROTOCOL'], 'HTTP/2')
+        self.assertEqual((environ['SERVER_NAME'], environ['SERVER_PORT']),
+                         ('example.com', '443'))
+        self.assertEqual((environ['REMOTE_ADDR'], environ['REMOTE_PORT']),
+                         ('10.0.0.1', '5000'))
+        self.assertEqual(environ['HTTP_HOST'], 'example.com')
+        self.assertEqual(environ['HTTP_COOKIE'], 'a=1; b=2')
+        self.assertEqual(environ['CONTENT_TYPE'], 'text/plain')
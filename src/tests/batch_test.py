@@ -0,0 +1,126 @@
+import unittest
+from app import create_app
+from models import db
+
+
+class TestBatchAPI(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'TESTING': True
+        })
+        self.client = self.app.test_client()
+        self.main_id = self.client.post('/warehouses', json={
+            'name': 'Main', 'capacity': 100
+        }).json['id']
+        self.small_id = self.client.post('/warehouses', json={
+            'name': 'Small', 'capacity': 5
+        }).json['id']
+        self.item_id = self.client.post(
+            f'/warehouses/{self.main_id}/items',
+            json={'name': 'Bolt', 'quantity': 20}
+        ).json['id']
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def _items(self, warehouse_id):
+        response = self.client.get(f'/warehouses/{warehouse_id}')
+        return {i['name']: i['quantity'] for i in response.json['items']}
+
+    def test_operations_commit_together(self):
+        response = self.client.post('/batch', json=[
+            {'op': 'create_item', 'warehouse_id': self.main_id,
+             'name': 'Nut', 'quantity': 4},
+            {'op': 'adjust_quantity', 'warehouse_id': self.main_id,
+             'item_id': self.item_id, 'delta': -5},
+            {'op': 'adjust_quantity', 'warehouse_id': self.main_id,
+             'item_id': self.item_id, 'delta': 2},
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = response.json['results']
+        self.assertEqual([r['op'] for r in results],
+                         ['create_item', 'adjust_quantity',
+                          'adjust_quantity'])
+        self.assertEqual(results[2]['quantity'], 17.0)
+        self.assertEqual(self._items(self.main_id),
+                         {'Bolt': 17.0, 'Nut': 4.0})
+
+    def test_failure_rolls_back_everything(self):
+        etag = self.client.get(f'/warehouses/{self.main_id}').headers['ETag']
+        response = self.client.post('/batch', json=[
+            {'op': 'create_item', 'warehouse_id': self.main_id,
+             'name': 'Nut'},
+            {'op': 'delete_item', 'warehouse_id': self.main_id,
+             'item_id': self.item_id},
+            {'op': 'delete_item', 'warehouse_id': self.main_id,
+             'item_id': 999},
+        ])
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json['index'], 2)
+        self.assertEqual(self._items(self.main_id), {'Bolt': 20.0})
+        self.assertEqual(
+            self.client.get(f'/warehouses/{self.main_id}').headers['ETag'],
+            etag
+        )
+        self.assertEqual(len(self.client.get('/changes').json), 3)
+
+    def test_transfer_is_clamped_to_target_capacity(self):
+        response = self.client.post('/batch', json=[
+            {'op': 'transfer', 'from_warehouse_id': self.main_id,
+             'to_warehouse_id': self.small_id, 'name': 'Bolt',
+             'amount': 8},
+        ])
+        self.assertEqual(response.status_code, 200)
+        result = response.json['results'][0]
+        self.assertEqual(result['moved'], 5.0)
+        self.assertTrue(result['target']['created'])
+        self.assertEqual(self._items(self.main_id), {'Bolt': 15.0})
+        self.assertEqual(self._items(self.small_id), {'Bolt': 5.0})
+
+    def test_transfer_is_limited_by_source_stock(self):
+        response = self.client.post('/batch', json=[
+            {'op': 'transfer', 'from_warehouse_id': self.small_id,
+             'to_warehouse_id': self.main_id, 'name': 'Bolt',
+             'amount': 3},
+        ])
+        self.assertEqual(response.status_code, 404)
+
+        self.client.post('/batch', json=[
+            {'op': 'transfer', 'from_warehouse_id': self.main_id,
+             'to_warehouse_id': self.small_id, 'name': 'Bolt',
+             'amount': 2},
+        ])
+        response = self.client.post('/batch', json=[
+            {'op': 'transfer', 'from_warehouse_id': self.small_id,
+             'to_warehouse_id': self.main_id, 'name': 'Bolt',
+             'amount': 10},
+        ])
+        self.assertEqual(response.json['results'][0]['moved'], 2.0)
+        self.assertEqual(self._items(self.main_id), {'Bolt': 20.0})
+        self.assertEqual(self._items(self.small_id), {'Bolt': 0.0})
+
+    def test_invalid_requests(self):
+        response = self.client.post('/batch', json={'op': 'delete_item'})
+        self.assertEqual(response.status_code, 400)
+
+        for operation in [
+            {'op': 'explode'},
+            {'op': ['create_item']},
+            {'op': {'name': 'x'}},
+            'not an object',
+            {'op': 'create_item', 'warehouse_id': self.main_id},
+            {'op': 'adjust_quantity', 'warehouse_id': self.main_id,
+             'item_id': self.item_id, 'delta': 'lots'},
+            {'op': 'transfer', 'from_warehouse_id': self.main_id,
+             'to_warehouse_id': self.main_id, 'name': 'Bolt', 'amount': 1},
+        ]:
+            response = self.client.post('/batch', json=[operation])
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json['index'], 0)
+
+        response = self.client.post('/batch', json=[
+            {'op': 'create_item', 'warehouse_id': 999, 'name': 'Nut'}
+        ])
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,64 @@
+import unittest
+from benchmarks.api_benchmark import compare, run
+from benchmarks import async_load_benchmark, ledger_benchmark, \
+    startup_benchmark
+
+STATS = {'p50_ms': 2.0, 'p99_ms': 5.0, 'throughput': 500.0}
+
+
+class TestApiBenchmark(unittest.TestCase):
+    def test_run_reports_all_scenarios(self):
+        results = run('client', warehouses=2, items=2, iterations=3)
+        self.assertEqual(set(results), {
+            'index', 'list_warehouses', 'get_warehouse',
+            'add_item', 'remove_item'
+        })
+        self.assertGreater(results['index']['throughput'], 0)
+
+    def test_compare_within_tolerance(self):
+        results = {'index': {**STATS, 'p50_ms': 2.3}}
+        self.assertEqual(compare(results, {'index': STATS}, 0.2), [])
+
+    def test_compare_detects_regressions(self):
+        results = {'index': {**STATS, 'p50_ms': 3.0, 'throughput': 100.0}}
+        self.assertEqual(len(compare(results, {'index': STATS}, 0.2)), 2)
+
+    def test_compare_ignores_new_scenarios(self):
+        self.assertEqual(compare({'index': STATS}, {}), [])
+
+
+class TestStartupBenchmark(unittest.TestCase):
+    def test_run_reports_boot_times(self):
+        results = startup_benchmark.run(processes=1, iterations=2)
+        self.assertEqual(set(results), {
+            'first_boot_ms', 'cold_start_ms',
+            'create_app_memory_ms', 'create_app_synced_ms'
+        })
+        self.assertGreater(results['cold_start_ms'], 0)
+
+
+class TestAsyncLoadBenchmark(unittest.TestCase):
+    def test_run_serves_both_modes_over_sockets(self):
+        results = async_load_benchmark.run(
+            async_load_benchmark.Load(2, 2, 2, 0.0)
+        )
+        self.assertGreater(results['threaded']['throughput'], 0)
+        if results['async'] is not None:
+            self.assertGreater(results['async']['throughput'], 0)
+
+
+class TestLedgerBenchmark(unittest.TestCase):
+    def test_snapshots_agree_with_full_replay(self):
+        # pylint: disable=protected-access
+        kirjanpito = ledger_benchmark._kirjanpito(500, tilannevali=16)
+        for hetki in (0, 15, 16, 17, 333, 500):
+            self.assertEqual(
+                kirjanpito.saldo_hetkella(hetki),
+                ledger_benchmark._toista_alusta(kirjanpito, hetki)
+            )
+
+    def test_toisto_reports_rates(self):
+        tulokset = ledger_benchmark.toisto(tapahtumia=2000, kyselyja=100)
+        self.assertEqual(set(tulokset), {
+            'kirjaus', 'saldo tilannekuvista', 'saldo koko historiasta'
+        })
@@ -0,0 +1,100 @@
+import unittest
+from app import create_app
+from cache import ResponseCache
+from models import db
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_get_returns_stored_body(self):
+        cache = ResponseCache(100)
+        cache.put('a', b'body')
+        self.assertEqual(cache.get('a'), b'body')
+        self.assertIsNone(cache.get('b'))
+
+    def test_evicts_least_recently_used(self):
+        cache = ResponseCache(10)
+        cache.put('a', b'aaaa')
+        cache.put('b', b'bbbb')
+        cache.get('a')
+        cache.put('c', b'cccc')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), b'aaaa')
+        self.assertEqual(cache.size, 8)
+
+    def test_replacing_entry_updates_size(self):
+        cache = ResponseCache(10)
+        cache.put('a', b'aaaa')
+        cache.put('a', b'aa')
+        self.assertEqual(cache.size, 2)
+        self.assertEqual(len(cache), 1)
+
+    def test_too_large_body_is_not_cached(self):
+        cache = ResponseCache(3)
+        cache.put('a', b'aaaa')
+        self.assertEqual(len(cache), 0)
+
+
+class TestConditionalRequests(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'TESTING': True
+        })
+        self.client = self.app.test_client()
+        response = self.client.post('/warehouses', json={'name': 'Cached'})
+        self.warehouse_id = response.json['id']
+        self.url = f'/warehouses/{self.warehouse_id}'
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def _etag(self, url):
+        return self.client.get(url).headers['ETag']
+
+    def test_not_modified_with_matching_etag(self):
+        etag = self._etag(self.url)
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+
+    def test_etag_is_stable_without_changes(self):
+        self.assertEqual(self._etag(self.url), self._etag(self.url))
+        self.assertEqual(self._etag('/warehouses'),
+                         self._etag('/warehouses'))
+
+    def test_item_changes_invalidate_warehouse(self):
+        etag = self._etag(self.url)
+        response = self.client.post(f'{self.url}/items',
+                                    json={'name': 'Item', 'quantity': 1})
+        item_url = f'{self.url}/items/{response.json["id"]}'
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['items'][0]['name'], 'Item')
+
+        etag = response.headers['ETag']
+        self.client.post(f'{item_url}/take', json={'amount': 1})
+        self.assertNotEqual(self._etag(self.url), etag)
+
+        etag = self._etag(self.url)
+        self.client.delete(item_url)
+        self.assertNotEqual(self._etag(self.url), etag)
+
+    def test_update_invalidates_warehouse_and_list(self):
+        etag = self._etag(self.url)
+        list_etag = self._etag('/warehouses')
+        self.client.put(self.url, json={'location': 'Turku'})
+
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.json['location'], 'Turku')
+        self.assertNotEqual(self._etag('/warehouses'), list_etag)
+
+    def test_create_and_delete_invalidate_list(self):
+        list_etag = self._etag('/warehouses')
+        self.client.post('/warehouses', json={'name': 'Other'})
+        self.assertNotEqual(self._etag('/warehouses'), list_etag)
+
+        list_etag = self._etag('/warehouses')
+        self.client.delete(self.url)
+        self.assertNotEqual(self._etag('/warehouses'), list_etag)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
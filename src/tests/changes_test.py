@@ -0,0 +1,116 @@
+import json
+import unittest
+from app import create_app
+from models import db
+
+
+class TestChangeFeed(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'TESTING': True,
+            'CHANGE_STREAM_POLL_SECONDS': 0.01,
+            'CHANGE_STREAM_MAX_SECONDS': 0.05
+        })
+        self.client = self.app.test_client()
+        response = self.client.post('/warehouses', json={'name': 'Feed'})
+        self.warehouse_id = response.json['id']
+        self.items_url = f'/warehouses/{self.warehouse_id}/items'
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def _changes(self, since=0):
+        response = self.client.get(f'/changes?since={since}')
+        self.assertEqual(response.status_code, 200)
+        return [(c['entity'], c['action'], c['id']) for c in response.json]
+
+    def test_warehouse_changes(self):
+        self.client.put(f'/warehouses/{self.warehouse_id}',
+                        json={'location': 'Oulu'})
+        self.client.delete(f'/warehouses/{self.warehouse_id}')
+        self.assertEqual(self._changes(), [
+            ('warehouse', 'create', self.warehouse_id),
+            ('warehouse', 'update', self.warehouse_id),
+            ('warehouse', 'delete', self.warehouse_id),
+        ])
+        response = self.client.get('/changes')
+        self.assertEqual(response.json[1]['data']['location'], 'Oulu')
+
+    def test_item_changes(self):
+        item_id = self.client.post(self.items_url,
+                                   json={'name': 'Juice'}).json['id']
+        self.client.post(f'{self.items_url}/{item_id}/add', json={'amount': 3})
+        self.client.post(f'{self.items_url}/{item_id}/take',
+                         json={'amount': 1})
+        self.client.delete(f'{self.items_url}/{item_id}')
+        self.assertEqual(self._changes(since=1), [
+            ('item', 'create', item_id),
+            ('item', 'update', item_id),
+            ('item', 'update', item_id),
+            ('item', 'delete', item_id),
+        ])
+        response = self.client.get('/changes?since=3')
+        self.assertAlmostEqual(response.json[0]['data']['quantity'], 2.0)
+
+    def test_warehouse_delete_logs_its_items(self):
+        item_ids = [
+            self.client.post(self.items_url, json={'name': name}).json['id']
+            for name in ('Juice', 'Milk')
+        ]
+        self.client.delete(f'/warehouses/{self.warehouse_id}')
+        self.assertEqual(self._changes(since=3), [
+            ('item', 'delete', item_ids[0]),
+            ('item', 'delete', item_ids[1]),
+            ('warehouse', 'delete', self.warehouse_id),
+        ])
+
+        other = self.client.post('/warehouses', json={'name': 'Form'}).json
+        item_id = self.client.post(f'/warehouses/{other["id"]}/items',
+                                   json={'name': 'Tea'}).json['id']
+        self.client.post(f'/warehouses/{other["id"]}/delete')
+        self.assertEqual(self._changes(since=8), [
+            ('item', 'delete', item_id),
+            ('warehouse', 'delete', other['id']),
+        ])
+
+    def test_limit_is_clamped(self):
+        self.client.put(f'/warehouses/{self.warehouse_id}',
+                        json={'location': 'Oulu'})
+        for limit in (-1, 0, 1):
+            response = self.client.get(f'/changes?limit={limit}')
+            self.assertEqual(len(response.json), 1)
+
+    def test_bulk_insert_is_logged(self):
+        self.client.post(f'{self.items_url}:bulk', json=[
+            {'name': 'A'}, {'name': 'B'}
+        ])
+        response = self.client.get('/changes?since=1')
+        self.assertEqual([c['data']['name'] for c in response.json],
+                         ['A', 'B'])
+
+    def test_rejected_write_is_not_logged(self):
+        self.client.post('/warehouses', json={'name': 'Feed'})
+        self.assertEqual(len(self._changes()), 1)
+
+    def test_invalid_since(self):
+        self.assertEqual(self.client.get('/changes?since=x').status_code, 400)
+
+    def test_event_stream(self):
+        self.client.post(self.items_url, json={'name': 'Juice'})
+        response = self.client.get('/changes/stream?since=1')
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        events = [block for block in response.text.split('\n\n')
+                  if block.startswith('id:')]
+        self.assertEqual(len(events), 1)
+        lines = events[0].split('\n')
+        self.assertEqual(lines[0], 'id: 2')
+        self.assertEqual(json.loads(lines[2][len('data: '):])['entity'],
+                         'item')
+
+    def test_event_stream_resumes_from_last_event_id(self):
+        self.client.post(self.items_url, json={'name': 'Juice'})
+        response = self.client.get('/changes/stream',
+                                   headers={'Last-Event-ID': '2'})
+        self.assertNotIn('id:', response.text)
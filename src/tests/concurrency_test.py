@@ -0,0 +1,173 @@
+import os
+import tempfile
+import threading
+import unittest
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+from app import create_app
+from models import db, Warehouse
+
+
+class TestOptimisticConcurrency(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'TESTING': True
+        })
+        self.client = self.app.test_client()
+        self.warehouse_id = self.client.post('/warehouses', json={
+            'name': 'Main', 'location': 'Oulu'
+        }).json['id']
+        self.url = f'/warehouses/{self.warehouse_id}'
+        self.item_url = self.url + '/items/' + str(self.client.post(
+            f'{self.url}/items', json={'name': 'Bolt', 'quantity': 1}
+        ).json['id'])
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def _etag(self, url):
+        return self.client.get(url).headers['ETag']
+
+    def test_warehouse_if_match(self):
+        etag = self._etag(self.url)
+        response = self.client.put(self.url, json={'location': 'Turku'},
+                                   headers={'If-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual(response.headers['ETag'], self._etag(self.url))
+
+        response = self.client.put(self.url, json={'location': 'Vaasa'},
+                                   headers={'If-Match': etag})
+        self.assertEqual(response.status_code, 412)
+        response = self.client.delete(self.url, headers={'If-Match': etag})
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(self.client.get(self.url).json['location'], 'Turku')
+
+        response = self.client.delete(
+            self.url, headers={'If-Match': self._etag(self.url)}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_item_changes_do_not_block_warehouse_edits(self):
+        etag = self._etag(self.url)
+        self.client.post(f'{self.item_url}/add', json={'amount': 1})
+        self.assertNotEqual(self._etag(self.url), etag)
+        response = self.client.put(self.url, json={'location': 'Turku'},
+                                   headers={'If-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+        self.client.post(f'{self.item_url}/take', json={'amount': 1})
+        response = self.client.delete(self.url, headers={'If-Match': etag})
+        self.assertEqual(response.status_code, 412)
+
+    def test_recreated_item_does_not_match_old_etag(self):
+        etag = self._etag(self.item_url)
+        self.client.delete(self.item_url)
+        item_id = self.client.post(f'{self.url}/items', json={
+            'name': 'Bolt', 'quantity': 1
+        }).json['id']
+        response = self.client.delete(f'{self.url}/items/{item_id}',
+                                      headers={'If-Match': etag})
+        self.assertEqual(response.status_code, 412)
+
+    def test_item_if_match(self):
+        etag = self._etag(self.item_url)
+        self.client.post(f'{self.item_url}/take', json={'amount': 1})
+        response = self.client.put(self.item_url, json={'quantity': 5},
+                                   headers={'If-Match': etag})
+        self.assertEqual(response.status_code, 412)
+        response = self.client.delete(self.item_url,
+                                      headers={'If-Match': etag})
+        self.assertEqual(response.status_code, 412)
+
+        response = self.client.put(
+            self.item_url, json={'quantity': 5},
+            headers={'If-Match': self._etag(self.item_url)}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['quantity'], 5.0)
+        self.assertEqual(response.headers['ETag'], self._etag(self.item_url))
+
+        response = self.client.get(
+            self.item_url, headers={'If-None-Match': response.headers['ETag']}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_stale_write_is_detected_without_if_match(self):
+        with self.app.app_context(), Session(db.engine) as session:
+            warehouse = session.get(Warehouse, self.warehouse_id)
+            self.client.put(self.url, json={'location': 'Turku'})
+            warehouse.location = 'Vaasa'
+            with self.assertRaises(StaleDataError):
+                session.commit()
+        self.assertEqual(self.client.get(self.url).json['location'], 'Turku')
+
+    def test_stock_changes_are_not_stale_writes(self):
+        with self.app.app_context(), Session(db.engine) as session:
+            warehouse = session.get(Warehouse, self.warehouse_id)
+            self.client.post(f'{self.item_url}/add', json={'amount': 1})
+            warehouse.location = 'Vaasa'
+            session.commit()
+        self.assertEqual(self.client.get(self.url).json['location'], 'Vaasa')
+
+    def test_edit_form_with_stale_version(self):
+        self.client.put(self.url, json={'location': 'Turku'})
+        response = self.client.post(f'{self.url}/edit', data={
+            'name': 'Main', 'location': 'Vaasa', 'version': '1'
+        })
+        self.assertIn(b'Modified by another request', response.data)
+        self.assertEqual(self.client.get(self.url).json['location'], 'Turku')
+
+
+class TestConcurrentWriters(unittest.TestCase):
+    WRITERS = 4
+    INCREMENTS = 10
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{self.path}',
+            'TESTING': True
+        })
+        self.url = '/warehouses/' + str(self.app.test_client().post(
+            '/warehouses', json={'name': 'Counter', 'location': '0'}
+        ).json['id'])
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+            db.engine.dispose()
+        os.remove(self.path)
+
+    def _writer(self, conflicts):
+        client = self.app.test_client()
+        done = 0
+        while done < self.INCREMENTS:
+            response = client.get(self.url)
+            counter = int(response.json['location'])
+            response = client.put(
+                self.url, json={'location': str(counter + 1)},
+                headers={'If-Match': response.headers['ETag']}
+            )
+            if response.status_code == 200:
+                done += 1
+            else:
+                conflicts.append(response.status_code)
+
+    def test_no_lost_updates(self):
+        conflicts = []
+        threads = [
+            threading.Thread(target=self._writer, args=(conflicts,))
+            for _ in range(self.WRITERS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        location = self.app.test_client().get(self.url).json['location']
+        self.assertEqual(int(location), self.WRITERS * self.INCREMENTS)
+        self.assertTrue(set(conflicts) <= {409, 412})
@@ -0,0 +1,139 @@
+import json
+import os
+import tempfile
+import unittest
+import importer
+from app import create_app
+from models import db
+
+CSV = """warehouse,location,description,capacity,item,quantity
+North,Oulu,,100,Bolt,5
+North,,,,Nut,2
+South,Turku,Coast,,,
+South,,,,Bolt,-1
+,,,,Bolt,1
+Existing,Espoo,,,Screw,3
+"""
+
+
+class TestImport(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'TESTING': True,
+            'IMPORT_CHUNK_SIZE': 2
+        })
+        self.client = self.app.test_client()
+        self.existing_id = self.client.post('/warehouses', json={
+            'name': 'Existing', 'location': 'Helsinki'
+        }).json['id']
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def _warehouses(self):
+        return {w['name']: w for w in self.client.get(
+            '/warehouses?include=items'
+        ).json}
+
+    def test_csv_import(self):
+        response = self.client.post('/import', data=CSV,
+                                    content_type='text/csv')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json['rows'], 6)
+        self.assertEqual(response.json['warehouses_created'], 2)
+        self.assertEqual(response.json['warehouses_updated'], 1)
+        self.assertEqual(response.json['items_inserted'], 3)
+        self.assertEqual(
+            [e['row'] for e in response.json['errors']], [3, 4]
+        )
+
+        warehouses = self._warehouses()
+        self.assertEqual(warehouses['North']['location'], 'Oulu')
+        self.assertEqual(warehouses['North']['capacity'], 100.0)
+        self.assertEqual([i['name'] for i in warehouses['North']['items']],
+                         ['Bolt', 'Nut'])
+        self.assertEqual(warehouses['South']['description'], 'Coast')
+        self.assertEqual(warehouses['Existing']['id'], self.existing_id)
+        self.assertEqual(warehouses['Existing']['location'], 'Espoo')
+
+    def test_ndjson_import(self):
+        lines = [
+            {'warehouse': 'North', 'item': 'Bolt', 'quantity': 1},
+            {'warehouse': 'North', 'item': 'Bolt', 'quantity': 2},
+            {'warehouse': 'North', 'capacity': 'lots'},
+        ]
+        body = '\n'.join(json.dumps(line) for line in lines) + '\nnot json\n'
+        response = self.client.post('/import', data=body,
+                                    content_type='application/x-ndjson')
+        self.assertEqual(response.json['items_inserted'], 2)
+        self.assertEqual(response.json['error_count'], 2)
+        self.assertEqual(len(self._warehouses()['North']['items']), 2)
+
+        changes = self.client.get('/changes?since=1').json
+        self.assertEqual([(c['entity'], c['action']) for c in changes],
+                         [('warehouse', 'create'), ('item', 'create'),
+                          ('item', 'create')])
+
+    def test_unchanged_warehouses_are_not_written(self):
+        url = f'/warehouses/{self.existing_id}'
+        etag = self.client.get(url).headers['ETag']
+        seq = self.client.get('/changes').json[-1]['seq']
+        body = 'warehouse,location\nExisting,Helsinki\nExisting,Helsinki\n'
+        response = self.client.post('/import', data=body,
+                                    content_type='text/csv')
+        self.assertEqual(response.json['warehouses_updated'], 0)
+        self.assertEqual(self.client.get(f'/changes?since={seq}').json, [])
+        self.assertEqual(self.client.get(url).headers['ETag'], etag)
+
+        body = 'warehouse,location,capacity\nExisting,Helsinki,5\nNorth,Oulu,7\n'
+        response = self.client.post('/import', data=body,
+                                    content_type='text/csv')
+        self.assertEqual(response.json['warehouses_updated'], 1)
+        self.assertNotEqual(self.client.get(url).headers['ETag'], etag)
+        changes = self.client.get(f'/changes?since={seq}').json
+        self.assertEqual([(c['action'], c['data']) for c in changes], [
+            ('create', {'id': 2, 'location': 'Oulu', 'description': '',
+                        'capacity': 7.0}),
+            ('update', {'id': self.existing_id, 'capacity': 5.0})
+        ])
+
+    def test_reported_errors_are_bounded(self):
+        body = 'not json\n' * (importer.MAX_REPORTED_ERRORS + 5)
+        response = self.client.post('/import', data=body,
+                                    content_type='application/x-ndjson')
+        self.assertEqual(response.json['error_count'],
+                         importer.MAX_REPORTED_ERRORS + 5)
+        self.assertEqual(len(response.json['errors']),
+                         importer.MAX_REPORTED_ERRORS)
+
+    def test_unsupported_type(self):
+        response = self.client.post('/import', json=[])
+        self.assertEqual(response.status_code, 415)
+
+
+class TestImportCommand(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'TESTING': True
+        })
+        handle, self.path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w', encoding='utf-8') as stream:
+            stream.write(CSV)
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+        os.remove(self.path)
+
+    def test_command_reports_progress(self):
+        result = self.app.test_cli_runner().invoke(
+            args=['import', self.path, '--chunk-size', '4']
+        )
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(len(result.stderr.splitlines()), 2)
+        summary = json.loads(result.stdout)
+        self.assertEqual(summary['warehouses_created'], 3)
+        self.assertEqual(summary['items_inserted'], 3)
@@ -0,0 +1,112 @@
+import unittest
+from app import create_app
+from models import db
+
+
+class TestItemLedger(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'TESTING': True
+        })
+        self.client = self.app.test_client()
+        self.warehouse_id = self.client.post('/warehouses', json={
+            'name': 'Ledger', 'capacity': 10
+        }).json['id']
+        self.items_url = f'/warehouses/{self.warehouse_id}/items'
+        self.item_id = self.client.post(
+            self.items_url, json={'name': 'Bolt', 'quantity': 4}
+        ).json['id']
+        self.item_url = f'{self.items_url}/{self.item_id}'
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def _movements(self, query=''):
+        response = self.client.get(f'{self.item_url}/movements{query}')
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_every_movement_is_recorded(self):
+        self.client.post(f'{self.item_url}/add', json={'amount': 20})
+        self.client.post(f'{self.item_url}/take', json={'amount': 3})
+        self.client.post(f'{self.item_url}/take', json={'amount': 0})
+        self.client.delete(self.item_url)
+
+        movements = self._movements().json
+        self.assertEqual([(m['delta'], m['quantity']) for m in movements],
+                         [(4.0, 4.0), (6.0, 10.0), (-3.0, 7.0),
+                          (-7.0, 0.0)])
+
+    def test_movements_are_paginated(self):
+        for _ in range(3):
+            self.client.post(f'{self.item_url}/add', json={'amount': 1})
+        response = self._movements('?limit=2')
+        self.assertEqual(len(response.json), 2)
+        after = response.headers['X-Next-After']
+        response = self._movements(f'?after={after}')
+        self.assertEqual([m['quantity'] for m in response.json], [6.0, 7.0])
+        self.assertNotIn('X-Next-After', response.headers)
+
+    def test_quantity_at_point_in_time(self):
+        self.client.post(f'{self.item_url}/add', json={'amount': 2})
+        first, second = self._movements().json
+        self.client.post(f'{self.item_url}/take', json={'amount': 5})
+
+        response = self.client.get(
+            f"{self.item_url}/quantity?seq={first['seq']}"
+        )
+        self.assertEqual(response.json['quantity'], 4.0)
+        response = self.client.get(
+            f"{self.item_url}/quantity?at={second['recorded_at']}"
+        )
+        self.assertIn(response.json['quantity'], (4.0, 6.0))
+        response = self.client.get(f'{self.item_url}/quantity')
+        self.assertEqual(response.json['quantity'], 1.0)
+
+        response = self.client.get(
+            f"{self.item_url}/quantity?at={first['recorded_at'] - 60}"
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(f'{self.item_url}/quantity?seq=x')
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_and_transfer_are_recorded(self):
+        other_id = self.client.post('/warehouses',
+                                    json={'name': 'Other'}).json['id']
+        result = self.client.post('/transfers', json={
+            'from_warehouse_id': self.warehouse_id,
+            'to_warehouse_id': other_id, 'name': 'Bolt', 'amount': 3
+        }).json
+        target_url = f"/warehouses/{other_id}/items/{result['target']['id']}"
+        response = self.client.get(f'{target_url}/movements')
+        self.assertEqual([m['quantity'] for m in response.json], [3.0])
+        response = self.client.get(f'{self.item_url}/quantity')
+        self.assertEqual(response.json['quantity'], 1.0)
+
+    def test_other_warehouse_sees_nothing(self):
+        response = self.client.get(
+            f'/warehouses/999/items/{self.item_id}/movements'
+        )
+        self.assertEqual(response.json, [])
+
+    def test_deleted_item_id_is_not_reused(self):
+        self.client.delete(self.item_url)
+        recreated = self.client.post(
+            self.items_url, json={'name': 'Bolt', 'quantity': 1}
+        ).json['id']
+        self.assertGreater(recreated, self.item_id)
+
+        old = self._movements().json
+        self.assertEqual([(m['delta'], m['quantity']) for m in old],
+                         [(4.0, 4.0), (-4.0, 0.0)])
+        response = self.client.get(
+            f'{self.items_url}/{recreated}/movements'
+        )
+        self.assertEqual([(m['delta'], m['quantity']) for m in response.json],
+                         [(1.0, 1.0)])
+        response = self.client.get(
+            f"{self.items_url}/{recreated}/quantity?at={old[0]['recorded_at']}"
+        )
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,86 @@
+import unittest
+from app import create_app
+from models import db, Warehouse, Item
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'TESTING': True,
+            'METRICS_ENABLED': True,
+            'METRICS_N_PLUS_ONE_THRESHOLD': 3
+        })
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def _metrics(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        return response.text
+
+    def test_records_latency_histogram(self):
+        self.client.get('/warehouses')
+        self.client.get('/warehouses')
+        text = self._metrics()
+        self.assertIn('http_request_duration_seconds_count'
+                      '{endpoint="warehouse.list_warehouses"} 2', text)
+        self.assertIn('http_request_duration_seconds_bucket'
+                      '{endpoint="warehouse.list_warehouses",le="+Inf"} 2',
+                      text)
+
+    def test_counts_sql_statements(self):
+        self.client.get('/warehouses/1')
+        text = self._metrics()
+        self.assertIn(
+            'db_statements_total{endpoint="warehouse.get_warehouse"} 1', text
+        )
+
+    def test_flags_repeated_statements(self):
+        with self.app.app_context():
+            for i in range(3):
+                warehouse = Warehouse(name=f'W{i}')
+                warehouse.items.append(Item(name='Item', quantity=1))
+                db.session.add(warehouse)
+            db.session.commit()
+
+        @self.app.route('/lazy')
+        def lazy():
+            return str(sum(len(w.items) for w in Warehouse.query.all()))
+
+        self.client.get('/lazy')
+        self.client.get('/warehouses?include=items')
+        self.client.post('/batch', json=[
+            {'op': 'create_item', 'warehouse_id': 1, 'name': f'Item {i}'}
+            for i in range(3)
+        ])
+        self.client.delete('/warehouses/1')
+        text = self._metrics()
+        self.assertIn('db_n_plus_one_suspected_total{endpoint="lazy"} 1', text)
+        for endpoint in ('warehouse.list_warehouses', 'batch.run_batch',
+                         'warehouse.delete_warehouse'):
+            self.assertIn('db_n_plus_one_suspected_total'
+                          f'{{endpoint="{endpoint}"}} 0', text)
+
+    def test_failed_statements_leave_nothing_behind(self):
+        self.client.post('/warehouses', json={'name': 'Main'})
+        for _ in range(4):
+            response = self.client.post('/warehouses', json={'name': 'Main'})
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get('/warehouses/1').status_code, 200)
+        text = self._metrics()
+        self.assertIn(
+            'db_statements_total{endpoint="warehouse.get_warehouse"} 3', text
+        )
+        with self.app.app_context(), db.engine.connect() as connection:
+            self.assertNotIn('query_start', connection.info)
+
+    def test_disabled_by_default(self):
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'TESTING': True
+        })
+        self.assertEqual(app.test_client().get('/metrics').status_code, 404)
@@ -0,0 +1,162 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from sqlalchemy import text, update
+from app import create_app
+from models import db, Warehouse
+from replicas import read_replica
+
+
+def _database_file():
+    handle, path = tempfile.mkstemp(suffix='.db')
+    os.close(handle)
+    return path
+
+
+def _query(path, sql, *params):
+    with sqlite3.connect(path) as connection:
+        return connection.execute(sql, params).fetchall()
+
+
+class TestReadReplicas(unittest.TestCase):
+    def setUp(self):
+        self.primary = _database_file()
+        self.replicas = [_database_file(), _database_file()]
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{self.primary}',
+            'SQLALCHEMY_READ_REPLICAS': [
+                f'sqlite:///{path}' for path in self.replicas
+            ],
+            'TESTING': True
+        })
+        self.client = self.app.test_client()
+        self.url = '/warehouses/' + str(self.client.post('/warehouses', json={
+            'name': 'Primary', 'location': 'Oulu'
+        }).json['id'])
+        self.client.post(f'{self.url}/items',
+                         json={'name': 'Bolt', 'quantity': 1})
+
+        # Copy the primary to both replicas and make them tell apart
+        with sqlite3.connect(self.primary) as source:
+            for index, path in enumerate(self.replicas):
+                with sqlite3.connect(path) as target:
+                    source.backup(target)
+                _query(path, 'UPDATE warehouses SET name = ?, revision = ?',
+                       f'Replica {index}', index + 1)
+
+    def tearDown(self):
+        with self.app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+        for path in [self.primary, *self.replicas]:
+            os.remove(path)
+
+    def test_reads_alternate_between_replicas(self):
+        names = [self.client.get(self.url).json['name'] for _ in range(4)]
+        self.assertEqual(names, ['Replica 0', 'Replica 1'] * 2)
+
+        listed = [self.client.get('/warehouses').json[0]['name']
+                  for _ in range(2)]
+        self.assertEqual(listed, ['Replica 0', 'Replica 1'])
+        self.assertIn(b'Replica 0', self.client.get('/').data)
+        self.assertIn(b'Replica 1', self.client.get(f'{self.url}/view').data)
+
+    def test_writes_go_to_primary(self):
+        response = self.client.put(self.url, json={'location': 'Turku'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['name'], 'Primary')
+        self.assertEqual(
+            _query(self.primary, 'SELECT location FROM warehouses'),
+            [('Turku',)]
+        )
+        for path in self.replicas:
+            self.assertEqual(_query(path, 'SELECT location FROM warehouses'),
+                             [('Oulu',)])
+
+    def test_unrouted_reads_use_primary(self):
+        response = self.client.get(f'{self.url}/items')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/warehouses/summary').json[0]['name'],
+                         'Primary')
+
+    def test_reads_after_a_write_use_primary(self):
+        @read_replica
+        def write_then_read():
+            db.session.execute(update(Warehouse).values(location='Vaasa'))
+            return db.session.get(Warehouse, 1)
+
+        @read_replica
+        def read():
+            return db.session.get(Warehouse, 1).name
+
+        with self.app.test_request_context():
+            warehouse = write_then_read()
+            self.assertEqual((warehouse.name, warehouse.location),
+                             ('Primary', 'Vaasa'))
+            self.assertEqual(read(), 'Primary')
+            db.session.commit()
+
+
+class TestReplicaEngines(unittest.TestCase):
+    def setUp(self):
+        self.primary = _database_file()
+        self.replica = _database_file()
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{self.primary}',
+            'SQLALCHEMY_READ_REPLICAS': [f'sqlite:///{self.replica}'],
+            'TESTING': True,
+            'DATABASE_PROFILE': 'production',
+            'METRICS_ENABLED': True
+        })
+        self.client = self.app.test_client()
+        self.client.post('/warehouses', json={'name': 'Main'})
+        with sqlite3.connect(self.primary) as source, \
+                sqlite3.connect(self.replica) as target:
+            source.backup(target)
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        for path in (self.primary, self.replica):
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def test_replica_statements_are_counted(self):
+        self.assertEqual(self.client.get('/warehouses/1').status_code, 200)
+        self.client.get('/')
+        metrics = self.client.get('/metrics').text
+        self.assertIn(
+            'db_statements_total{endpoint="warehouse.get_warehouse"} 3',
+            metrics
+        )
+        self.assertIn('db_statements_total{endpoint="warehouse.index"} 1',
+                      metrics)
+
+    def test_replicas_get_read_pragmas_only(self):
+        with self.app.app_context(), \
+                db.engines['replica-0'].connect() as connection:
+            self.assertEqual(
+                connection.execute(text('PRAGMA busy_timeout')).scalar(), 5000
+            )
+            # FULL, not the primary's NORMAL
+            self.assertEqual(
+                connection.execute(text('PRAGMA synchronous')).scalar(), 2
+            )
+
+
+class TestWithoutReplicas(unittest.TestCase):
+    def test_reads_use_primary(self):
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'TESTING': True
+        })
+        self.assertNotIn('read_replicas', app.extensions)
+        client = app.test_client()
+        url = '/warehouses/' + str(client.post('/warehouses', json={
+            'name': 'Main'
+        }).json['id'])
+        self.assertEqual(client.get(url).json['name'], 'Main')
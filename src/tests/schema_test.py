@@ -0,0 +1,166 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from sqlalchemy import inspect
+from app import create_app
+from models import db, Warehouse
+from schema import schema_version, upgrade_schema
+
+OLD_SCHEMA = """
+CREATE TABLE warehouses (
+    id INTEGER PRIMARY KEY,
+    name VARCHAR(100) NOT NULL UNIQUE,
+    location VARCHAR(200),
+    description TEXT
+);
+CREATE TABLE items (
+    id INTEGER PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    quantity FLOAT NOT NULL,
+    warehouse_id INTEGER NOT NULL REFERENCES warehouses (id)
+);
+INSERT INTO warehouses (id, name) VALUES (1, 'Old');
+INSERT INTO items (name, quantity, warehouse_id) VALUES ('Item', 2.0, 1);
+"""
+
+
+class TestSchemaUpgrade(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        with sqlite3.connect(self.path) as connection:
+            connection.executescript(OLD_SCHEMA)
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{self.path}',
+            'TESTING': True
+        })
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.engine.dispose()
+        os.remove(self.path)
+
+    def test_missing_columns_are_added(self):
+        with self.app.app_context():
+            columns = {
+                c['name'] for c in inspect(db.engine).get_columns('warehouses')
+            }
+            self.assertIn('capacity', columns)
+            self.assertIsNone(db.session.get(Warehouse, 1).capacity)
+
+    def test_missing_indexes_are_created(self):
+        with self.app.app_context():
+            indexes = {
+                i['name'] for i in inspect(db.engine).get_indexes('items')
+            }
+            self.assertIn('ix_items_warehouse_id_name', indexes)
+
+    def test_existing_data_is_kept(self):
+        response = self.app.test_client().get('/warehouses/1')
+        self.assertEqual(response.json['name'], 'Old')
+        self.assertEqual(response.json['items'][0]['name'], 'Item')
+
+    def test_summary_is_backfilled(self):
+        response = self.app.test_client().get('/warehouses/summary')
+        self.assertEqual(response.json[0]['item_count'], 1)
+        self.assertAlmostEqual(response.json[0]['total_quantity'], 2.0)
+
+    def test_ledger_is_backfilled(self):
+        client = self.app.test_client()
+        response = client.get('/warehouses/1/items/1/movements')
+        self.assertEqual([m['quantity'] for m in response.json], [2.0])
+
+    def test_upgrade_is_idempotent(self):
+        create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{self.path}',
+            'TESTING': True
+        })
+        response = self.app.test_client().get('/warehouses/1')
+        self.assertEqual(response.status_code, 200)
+
+    def test_items_are_rebuilt_with_autoincrement(self):
+        with sqlite3.connect(self.path) as connection:
+            sql = connection.execute(
+                "SELECT sql FROM sqlite_master WHERE name = 'items'"
+            ).fetchone()[0]
+        self.assertIn('AUTOINCREMENT', sql)
+
+        client = self.app.test_client()
+        client.delete('/warehouses/1/items/1')
+        created = client.post('/warehouses/1/items',
+                              json={'name': 'New', 'quantity': 1}).json
+        self.assertEqual(created['id'], 2)
+        response = client.get('/warehouses/summary')
+        self.assertEqual(response.json[0]['item_count'], 1)
+        response = client.get('/items?name_contains=New')
+        self.assertEqual([i['id'] for i in response.json], [2])
+
+
+class TestSchemaVersion(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        self.config = {
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{self.path}',
+            'TESTING': True
+        }
+        self.app = create_app(self.config)
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.engine.dispose()
+        os.remove(self.path)
+
+    def _index_names(self):
+        with sqlite3.connect(self.path) as connection:
+            return {row[0] for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )}
+
+    def test_items_from_the_ledger_are_not_reused(self):
+        # A database from before items used AUTOINCREMENT, where item 3 was
+        # deleted after the ledger recorded it
+        with sqlite3.connect(self.path) as connection:
+            connection.executescript("""
+                DROP TABLE items;
+                CREATE TABLE items (
+                    id INTEGER PRIMARY KEY,
+                    name VARCHAR(100) NOT NULL,
+                    quantity FLOAT NOT NULL,
+                    warehouse_id INTEGER NOT NULL,
+                    version INTEGER DEFAULT 1 NOT NULL
+                );
+                INSERT INTO warehouses (id, name) VALUES (1, 'Old');
+                INSERT INTO items (id, name, quantity, warehouse_id)
+                VALUES (1, 'Kept', 1, 1);
+                INSERT INTO item_movements
+                    (item_id, warehouse_id, delta, quantity, recorded_at)
+                VALUES (1, 1, 1, 1, 0), (3, 1, 7, 7, 0), (3, 1, -7, 0, 0);
+                UPDATE schema_version SET fingerprint = 'x';
+            """)
+        client = create_app(self.config).test_client()
+        created = client.post('/warehouses/1/items',
+                              json={'name': 'New', 'quantity': 1}).json
+        self.assertEqual(created['id'], 4)
+        response = client.get('/warehouses/1/items/4/movements')
+        self.assertEqual([m['quantity'] for m in response.json], [1.0])
+
+    def test_synced_schema_is_skipped(self):
+        with self.app.app_context():
+            self.assertFalse(upgrade_schema())
+        with sqlite3.connect(self.path) as connection:
+            connection.execute('DROP INDEX ix_items_warehouse_id_name')
+        create_app(self.config)
+        self.assertNotIn('ix_items_warehouse_id_name', self._index_names())
+
+    def test_stale_fingerprint_resyncs(self):
+        with sqlite3.connect(self.path) as connection:
+            connection.execute('DROP INDEX ix_items_warehouse_id_name')
+            connection.execute("UPDATE schema_version SET fingerprint = 'x'")
+        with self.app.app_context():
+            self.assertTrue(upgrade_schema())
+            self.assertEqual(len(db.session.execute(
+                schema_version.select()
+            ).all()), 1)
+        self.assertIn('ix_items_warehouse_id_name', self._index_names())
@@ -0,0 +1,83 @@
+import unittest
+from app import create_app
+from models import db, Warehouse, Item
+
+
+class TestItemSearch(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'TESTING': True
+        })
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            first = Warehouse(name='First')
+            first.items.append(Item(name='Orange Juice', quantity=5))
+            first.items.append(Item(name='Apple Juice', quantity=1))
+            second = Warehouse(name='Second')
+            second.items.append(Item(name='Orange Juice', quantity=20))
+            second.items.append(Item(name='100% Cocoa', quantity=2))
+            db.session.add_all([first, second])
+            db.session.commit()
+            self.second_id = second.id
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def _names(self, query):
+        response = self.client.get(f'/items?{query}')
+        self.assertEqual(response.status_code, 200)
+        return [item['name'] for item in response.json]
+
+    def test_fts_is_enabled(self):
+        self.assertTrue(self.app.extensions['item_search_fts'])
+
+    def test_exact_name(self):
+        self.assertEqual(self._names('name=Orange Juice'),
+                         ['Orange Juice', 'Orange Juice'])
+
+    def test_name_prefix(self):
+        self.assertEqual(self._names('name_prefix=appl'), ['Apple Juice'])
+
+    def test_name_contains(self):
+        self.assertEqual(self._names('name_contains=juice'),
+                         ['Orange Juice', 'Apple Juice', 'Orange Juice'])
+
+    def test_name_contains_wildcard_is_literal(self):
+        self.assertEqual(self._names('name_contains=0%25 C'), ['100% Cocoa'])
+
+    def test_quantity_range_and_warehouse(self):
+        self.assertEqual(self._names('min_qty=2&max_qty=10'),
+                         ['Orange Juice', '100% Cocoa'])
+        self.assertEqual(
+            self._names(f'name_contains=juice&warehouse_id={self.second_id}'),
+            ['Orange Juice']
+        )
+
+    def test_search_follows_item_changes(self):
+        response = self.client.post(f'/warehouses/{self.second_id}/items',
+                                    json={'name': 'Grape Juice'})
+        self.assertEqual(self._names('name_prefix=grape'), ['Grape Juice'])
+
+        self.client.delete(
+            f'/warehouses/{self.second_id}/items/{response.json["id"]}'
+        )
+        self.assertEqual(self._names('name_prefix=grape'), [])
+
+    def test_cursor_pagination(self):
+        first = self.client.get('/items?name_contains=juice&limit=2')
+        self.assertEqual(len(first.json), 2)
+        after = first.headers['X-Next-After']
+        second = self.client.get(f'/items?name_contains=juice&after={after}')
+        self.assertEqual(len(second.json), 1)
+        self.assertNotIn('X-Next-After', second.headers)
+
+    def test_invalid_filter(self):
+        response = self.client.get('/items?min_qty=lots')
+        self.assertEqual(response.status_code, 400)
+
+    def test_like_fallback_without_fts(self):
+        self.app.extensions['item_search_fts'] = False
+        self.assertEqual(self._names('name_prefix=appl'), ['Apple Juice'])
+        self.assertEqual(self._names('name_contains=0%25 C'), ['100% Cocoa'])
@@ -0,0 +1,67 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+import simulaatio
+from benchmarks.simulaatio_benchmark import satunnaiset_skenaariot, \
+    skaalautuvuus
+
+CSV = """skenaario,varasto,tilavuus,alku_saldo,maara
+a,x,10,2,
+a,y,5,,3
+a,x,,,12
+a,x,,,-4
+b,x,4,4,-6
+"""
+
+
+class TestSimulaatio(unittest.TestCase):
+    def test_lue_csv(self):
+        a, b = simulaatio.lue_csv(io.StringIO(CSV))
+        self.assertEqual(a["nimi"], "a")
+        self.assertEqual(a["varastot"], [(10.0, 2.0), (5.0, 0.0)])
+        self.assertEqual(a["tapahtumat"], [(1, 3.0), (0, 12.0), (0, -4.0)])
+        self.assertEqual(b["tapahtumat"], [(0, -6.0)])
+
+    def test_lue_json_tiedostosta(self):
+        skenaariot = [{"varastot": [{"tilavuus": 10}],
+                       "tapahtumat": [[0, 3]]}]
+        handle, polku = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(handle, "w") as tiedosto:
+            json.dump(skenaariot, tiedosto)
+        try:
+            luetut = simulaatio.lue(polku)
+        finally:
+            os.remove(polku)
+        self.assertEqual(luetut, [{"nimi": "0", "varastot": [(10.0, 0.0)],
+                                   "tapahtumat": [(0, 3.0)]}])
+
+    def test_mittarit(self):
+        tulokset = simulaatio.aja(simulaatio.lue_csv(io.StringIO(CSV)), 1)
+        a, b = tulokset["skenaariot"]
+        self.assertAlmostEqual(a["lisatty"], 11.0)
+        self.assertAlmostEqual(a["ylivuoto"], 4.0)
+        self.assertEqual(a["saldot"], [6.0, 3.0])
+        self.assertEqual(a["loppuunmyynnit"], 0)
+        self.assertAlmostEqual(a["tayttoaste"], 1.0)
+        self.assertEqual(b["loppuunmyynnit"], 1)
+        self.assertAlmostEqual(b["tayttoaste"], 4 / 6)
+
+        yhteensa = tulokset["yhteensa"]
+        self.assertEqual(yhteensa["skenaarioita"], 2)
+        self.assertAlmostEqual(yhteensa["tayttoaste"], 8 / 10)
+
+    def test_rinnakkainen_vastaa_sarjallista(self):
+        skenaariot = satunnaiset_skenaariot(40)
+        sarjassa = simulaatio.aja(skenaariot, prosesseja=1)
+        rinnakkain = simulaatio.aja(skenaariot, prosesseja=2, palan_koko=3)
+        self.assertEqual(rinnakkain, sarjassa)
+
+    def test_tyhja(self):
+        self.assertEqual(simulaatio.aja([], 2)["yhteensa"]["tayttoaste"], 1.0)
+
+    def test_skaalautuvuus(self):
+        tulokset = skaalautuvuus(20, 10, prosessimaarat=[1, 2])
+        self.assertTrue(all(t["sama kuin sarjassa"]
+                            for t in tulokset.values()))
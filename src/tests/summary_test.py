@@ -0,0 +1,111 @@
+import unittest
+from sqlalchemy import update
+from app import create_app
+from models import db, Warehouse, WarehouseItemName
+
+
+class TestWarehouseSummary(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'TESTING': True
+        })
+        self.client = self.app.test_client()
+        response = self.client.post('/warehouses', json={'name': 'Summary'})
+        self.warehouse_id = response.json['id']
+        self.items_url = f'/warehouses/{self.warehouse_id}/items'
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def _summary(self):
+        response = self.client.get('/warehouses/summary')
+        self.assertEqual(response.status_code, 200)
+        return response.json[0]
+
+    def _add(self, name, quantity):
+        response = self.client.post(self.items_url,
+                                    json={'name': name, 'quantity': quantity})
+        return response.json['id']
+
+    def _assert_summary(self, count, total, distinct):
+        summary = self._summary()
+        self.assertEqual(summary['item_count'], count)
+        self.assertAlmostEqual(summary['total_quantity'], total)
+        self.assertEqual(summary['distinct_item_names'], distinct)
+
+    def test_empty_warehouse(self):
+        self._assert_summary(0, 0.0, 0)
+
+    def test_add_items(self):
+        self._add('Juice', 2)
+        self._add('Juice', 3)
+        self._add('Beer', 1)
+        self._assert_summary(3, 6.0, 2)
+
+    def test_bulk_add(self):
+        self.client.post(f'{self.items_url}:bulk', json=[
+            {'name': 'A', 'quantity': 1}, {'name': 'B', 'quantity': 2}
+        ])
+        self._assert_summary(2, 3.0, 2)
+
+    def test_stock_moves(self):
+        item_id = self._add('Juice', 2)
+        self.client.post(f'{self.items_url}/{item_id}/add', json={'amount': 5})
+        self.client.post(f'{self.items_url}/{item_id}/take',
+                         json={'amount': 3})
+        self._assert_summary(1, 4.0, 1)
+
+    def test_remove_items(self):
+        first = self._add('Juice', 2)
+        second = self._add('Juice', 3)
+        self.client.delete(f'{self.items_url}/{first}')
+        self._assert_summary(1, 3.0, 1)
+        self.client.post(f'{self.items_url}/{second}/delete')
+        self._assert_summary(0, 0.0, 0)
+
+    def test_delete_warehouse_cleans_up(self):
+        self._add('Juice', 2)
+        self.client.delete(f'/warehouses/{self.warehouse_id}')
+        self.assertEqual(self.client.get('/warehouses/summary').json, [])
+        with self.app.app_context():
+            self.assertEqual(WarehouseItemName.query.count(), 0)
+
+    def test_capacity_uses_maintained_total(self):
+        self.client.put(f'/warehouses/{self.warehouse_id}',
+                        json={'capacity': 10})
+        self._add('Other', 6)
+        item_id = self._add('Juice', 1)
+        response = self.client.post(f'{self.items_url}/{item_id}/add',
+                                    json={'amount': 10})
+        self.assertAlmostEqual(response.json['quantity'], 4.0)
+
+    def test_fallback_without_triggers(self):
+        self._add('Juice', 2)
+        self._add('Juice', 3)
+        self.app.extensions['warehouse_summary'] = False
+        self._assert_summary(2, 5.0, 1)
+
+    def test_index_shows_maintained_counts(self):
+        self._add('Juice', 2.5)
+        response = self.client.get('/')
+        self.assertIn(b'<td>1</td>', response.data)
+        self.assertIn(b'<td>2.5</td>', response.data)
+
+    def test_view_uses_maintained_count(self):
+        self._add('Juice', 2)
+        self._add('Beer', 1)
+        with self.app.app_context():
+            db.session.execute(update(Warehouse).values(item_count=7))
+            db.session.commit()
+        url = f'/warehouses/{self.warehouse_id}/view'
+        self.assertIn(b'Items (7)', self.client.get(url).data)
+        self.app.extensions['warehouse_summary'] = False
+        self.assertIn(b'Items (2)', self.client.get(url).data)
+
+    def test_summary_matches_rows(self):
+        self._add('Juice', 2)
+        with self.app.app_context():
+            warehouse = db.session.get(Warehouse, self.warehouse_id)
+            self.assertEqual(warehouse.item_count, 1)
@@ -0,0 +1,144 @@
+import os
+import random
+import tempfile
+import threading
+import unittest
+from app import create_app
+from models import db
+
+
+class TestTransferAPI(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'TESTING': True
+        })
+        self.client = self.app.test_client()
+        self.main_id = self.client.post('/warehouses', json={
+            'name': 'Main', 'capacity': 100
+        }).json['id']
+        self.small_id = self.client.post('/warehouses', json={
+            'name': 'Small', 'capacity': 5
+        }).json['id']
+        self.client.post(f'/warehouses/{self.main_id}/items',
+                         json={'name': 'Bolt', 'quantity': 20})
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def _transfer(self, from_id, to_id, amount, name='Bolt'):
+        return self.client.post('/transfers', json={
+            'from_warehouse_id': from_id, 'to_warehouse_id': to_id,
+            'name': name, 'amount': amount
+        })
+
+    def test_partial_transfer(self):
+        response = self._transfer(self.main_id, self.small_id, 8)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['moved'], 5.0)
+        self.assertEqual(response.json['source']['quantity'], 15.0)
+        self.assertEqual(response.json['target']['quantity'], 5.0)
+
+        response = self._transfer(self.small_id, self.main_id, 9)
+        self.assertEqual(response.json['moved'], 5.0)
+        self.assertFalse(response.json['target']['created'])
+        self.assertEqual(response.json['target']['quantity'], 20.0)
+
+    def test_transfer_is_logged(self):
+        self._transfer(self.main_id, self.small_id, 2)
+        changes = self.client.get('/changes?since=3').json
+        self.assertEqual([(c['action'], c['warehouse_id']) for c in changes],
+                         [('update', self.main_id),
+                          ('create', self.small_id)])
+        self.assertEqual(changes[1]['data']['quantity'], 2.0)
+
+    def test_transfer_into_full_warehouse_creates_nothing(self):
+        full_id = self.client.post('/warehouses', json={
+            'name': 'Full', 'capacity': 0
+        }).json['id']
+        since = self.client.get('/changes').json[-1]['seq']
+        response = self._transfer(self.main_id, full_id, 3)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['moved'], 0.0)
+        self.assertEqual(response.json['target'],
+                         {'id': None, 'quantity': 0.0, 'created': False})
+        self.assertEqual(
+            self.client.get(f'/warehouses/{full_id}').json['items'], []
+        )
+        self.assertEqual(self.client.get(f'/changes?since={since}').json, [])
+
+    def test_invalid_transfers(self):
+        self.assertEqual(self.client.post('/transfers', json=[]).status_code,
+                         400)
+        self.assertEqual(
+            self._transfer(self.main_id, self.main_id, 1).status_code, 400
+        )
+        self.assertEqual(
+            self._transfer(self.main_id, 999, 1).status_code, 404
+        )
+        self.assertEqual(
+            self._transfer(self.main_id, self.small_id, 1, 'Nut').status_code,
+            404
+        )
+
+
+class TestTransferContention(unittest.TestCase):
+    WORKERS = 6
+    TRANSFERS = 25
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{self.path}',
+            'TESTING': True
+        })
+        client = self.app.test_client()
+        self.warehouse_ids = []
+        for index, capacity in enumerate([60, 40, 30]):
+            warehouse_id = client.post('/warehouses', json={
+                'name': f'W{index}', 'capacity': capacity
+            }).json['id']
+            client.post(f'/warehouses/{warehouse_id}/items',
+                        json={'name': 'Bolt', 'quantity': capacity / 2})
+            self.warehouse_ids.append(warehouse_id)
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+            db.engine.dispose()
+        os.remove(self.path)
+
+    def _worker(self, seed, errors):
+        rng = random.Random(seed)
+        client = self.app.test_client()
+        for _ in range(self.TRANSFERS):
+            from_id, to_id = rng.sample(self.warehouse_ids, 2)
+            response = client.post('/transfers', json={
+                'from_warehouse_id': from_id, 'to_warehouse_id': to_id,
+                'name': 'Bolt', 'amount': rng.randint(1, 20)
+            })
+            if response.status_code != 200:
+                errors.append(response.status_code)
+
+    def test_stock_is_conserved(self):
+        errors = []
+        threads = [
+            threading.Thread(target=self._worker, args=(seed, errors))
+            for seed in range(self.WORKERS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        client = self.app.test_client()
+        total = 0.0
+        for warehouse_id in self.warehouse_ids:
+            warehouse = client.get(f'/warehouses/{warehouse_id}').json
+            stocked = sum(i['quantity'] for i in warehouse['items'])
+            self.assertLessEqual(stocked, warehouse['capacity'])
+            total += stocked
+        self.assertEqual(total, 65.0)
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from sqlalchemy import text
+from app import create_app
+from models import db
+from tuning import config_from_env
+
+
+class TestEngineTuning(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+
+    def tearDown(self):
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def _pragma(self, profile, name, **config):
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{self.path}',
+            'TESTING': True,
+            'DATABASE_PROFILE': profile,
+            **config
+        })
+        with app.app_context():
+            value = db.session.execute(text(f'PRAGMA {name}')).scalar()
+            db.session.remove()
+            db.engine.dispose()
+        return value
+
+    def test_default_profile_keeps_sqlite_defaults(self):
+        self.assertEqual(self._pragma('default', 'journal_mode'), 'delete')
+
+    def test_production_profile_enables_wal(self):
+        self.assertEqual(self._pragma('production', 'journal_mode'), 'wal')
+        self.assertEqual(self._pragma('production', 'synchronous'), 1)
+        self.assertEqual(self._pragma('production', 'busy_timeout'), 5000)
+
+    def test_production_profile_pragma_override(self):
+        value = self._pragma('production', 'cache_size',
+                             SQLITE_PRAGMAS={'cache_size': -1000})
+        self.assertEqual(value, -1000)
+
+    def test_config_from_env(self):
+        env = {
+            'DATABASE_PROFILE': 'production',
+            'DB_POOL_SIZE': '20',
+            'SQLITE_BUSY_TIMEOUT': '100',
+        }
+        with mock.patch.dict(os.environ, env):
+            config = config_from_env()
+        self.assertEqual(config['DATABASE_PROFILE'], 'production')
+        self.assertEqual(config['SQLALCHEMY_ENGINE_OPTIONS'],
+                         {'pool_size': 20})
+        self.assertEqual(config['SQLITE_PRAGMAS'], {'busy_timeout': 100})
@@ -1,5 +1,9 @@
+import random
 import unittest
-from varasto import Varasto
+from unittest import mock
+import varasto
+from varasto import Varasto, VarastoArray, VarastoKirjanpito
+from benchmarks.varasto_benchmark import muistia_per_varasto
 
 
 class TestVarasto(unittest.TestCase):
@@ -83,3 +87,110 @@ class TestVarasto(unittest.TestCase):
         self.varasto.lisaa_varastoon(3)
         self.assertEqual(str(self.varasto), "saldo = 3, vielä tilaa 7")
 
+    def test_varastolla_ei_ole_dictia(self):
+        self.assertFalse(hasattr(self.varasto, "__dict__"))
+        with self.assertRaises(AttributeError):
+            self.varasto.muu = 1
+
+    def test_muistia_per_varasto(self):
+        self.assertLess(muistia_per_varasto(10_000), 64)
+
+
+class TestVarastoArray(unittest.TestCase):
+    def setUp(self):
+        self.satunnainen = random.Random(1234)
+
+    def _arvot(self, maara, alaraja, ylaraja):
+        return [
+            self.satunnainen.uniform(alaraja, ylaraja) for _ in range(maara)
+        ]
+
+    def _vertaa_skalaariin(self):
+        tilavuudet = self._arvot(200, -5, 50)
+        alku_saldot = self._arvot(200, -5, 60)
+        varastot = [Varasto(t, a) for t, a in zip(tilavuudet, alku_saldot)]
+        taulukko = VarastoArray(tilavuudet, alku_saldot)
+
+        for _ in range(20):
+            lisaykset = self._arvot(200, -10, 30)
+            otot = self._arvot(200, -10, 30)
+            for v, maara in zip(varastot, lisaykset):
+                v.lisaa_varastoon(maara)
+            taulukko.lisaa_varastoon(lisaykset)
+            saadut = [v.ota_varastosta(m) for v, m in zip(varastot, otot)]
+
+            self.assertEqual(list(taulukko.ota_varastosta(otot)), saadut)
+            self.assertEqual(list(taulukko.saldo),
+                             [v.saldo for v in varastot])
+            self.assertEqual(list(taulukko.paljonko_mahtuu()),
+                             [v.paljonko_mahtuu() for v in varastot])
+
+    def test_vastaa_skalaaria(self):
+        # numpy on dev-riippuvuus, joten vektoroitu polku testataan aina
+        self.assertIsNotNone(varasto.numpy)
+        self._vertaa_skalaariin()
+
+    def test_vastaa_skalaaria_ilman_numpya(self):
+        with mock.patch.object(varasto, "numpy", None):
+            self._vertaa_skalaariin()
+
+    def test_konstruktori_rajaa_arvot(self):
+        taulukko = VarastoArray([10, -5, 10], [-3, 2, 15])
+        self.assertEqual(list(taulukko.tilavuus), [10.0, 0.0, 10.0])
+        self.assertEqual(list(taulukko.saldo), [0.0, 0.0, 10.0])
+        self.assertEqual(len(taulukko), 3)
+
+    def test_vaaran_pituiset_maarat(self):
+        taulukko = VarastoArray([10, 10])
+        with self.assertRaises(ValueError):
+            taulukko.lisaa_varastoon([1])
+        with self.assertRaises(ValueError):
+            taulukko.ota_varastosta([1, 2, 3])
+        with self.assertRaises(ValueError):
+            VarastoArray([10, 10], [1])
+
+
+class TestVarastoKirjanpito(unittest.TestCase):
+    def setUp(self):
+        self.satunnainen = random.Random(4321)
+        self.kirjanpito = VarastoKirjanpito(50, 10, tilannevali=7)
+
+    def test_toimii_kuin_varasto(self):
+        varasto = Varasto(50, 10)
+        for _ in range(100):
+            maara = self.satunnainen.uniform(-20, 20)
+            if maara >= 0:
+                varasto.lisaa_varastoon(maara)
+                self.kirjanpito.lisaa_varastoon(maara)
+            else:
+                self.assertEqual(self.kirjanpito.ota_varastosta(-maara),
+                                 varasto.ota_varastosta(-maara))
+        self.assertEqual(self.kirjanpito.saldo, varasto.saldo)
+        self.assertEqual(len(self.kirjanpito), 100)
+
+    def test_saldo_hetkella_toistaa_historian(self):
+        varasto = Varasto(50, 10)
+        saldot = [varasto.saldo]
+        maarat = [self.satunnainen.uniform(-20, 20) for _ in range(100)]
+        for maara in maarat:
+            if maara >= 0:
+                varasto.lisaa_varastoon(maara)
+            else:
+                varasto.ota_varastosta(-maara)
+            saldot.append(varasto.saldo)
+        self.kirjanpito.kirjaa_tapahtumat(maarat)
+
+        for hetki, saldo in enumerate(saldot):
+            self.assertEqual(self.kirjanpito.saldo_hetkella(hetki), saldo)
+
+    def test_negatiivinen_lisays_kirjataan_nollana(self):
+        self.kirjanpito.lisaa_varastoon(-5)
+        self.kirjanpito.ota_varastosta(-5)
+        self.assertEqual(list(self.kirjanpito.tapahtumat), [0.0, -0.0])
+        self.assertAlmostEqual(self.kirjanpito.saldo_hetkella(2), 10.0)
+
+    def test_vaara_hetki(self):
+        with self.assertRaises(IndexError):
+            self.kirjanpito.saldo_hetkella(1)
+        with self.assertRaises(ValueError):
+            VarastoKirjanpito(10, tilannevali=0)
@@ -1,3 +1,7 @@
+import base64
+import csv
+import io
+import json
 import unittest
 from app import create_app
 from models import db, Warehouse, Item
@@ -115,6 +119,92 @@ class TestWarehouseAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 404)
 
 
+class TestWarehousePagination(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'TESTING': True
+        })
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+            for i in range(5):
+                warehouse = Warehouse(name=f'Warehouse{i}')
+                warehouse.items.append(Item(name=f'Item{i}', quantity=i))
+                db.session.add(warehouse)
+            db.session.commit()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_list_excludes_items_by_default(self):
+        response = self.client.get('/warehouses')
+        self.assertEqual(len(response.json), 5)
+        self.assertNotIn('items', response.json[0])
+
+    def test_list_include_items(self):
+        response = self.client.get('/warehouses?include=items')
+        self.assertEqual(response.json[2]['items'][0]['name'], 'Item2')
+
+    def test_list_cursor_pagination(self):
+        first = self.client.get('/warehouses?limit=2')
+        self.assertEqual([w['name'] for w in first.json],
+                         ['Warehouse0', 'Warehouse1'])
+        after = first.headers['X-Next-After']
+
+        second = self.client.get(f'/warehouses?limit=2&after={after}')
+        self.assertEqual([w['name'] for w in second.json],
+                         ['Warehouse2', 'Warehouse3'])
+
+    def test_list_last_page_has_no_cursor(self):
+        response = self.client.get('/warehouses?limit=5')
+        self.assertEqual(len(response.json), 5)
+        self.assertNotIn('X-Next-After', response.headers)
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'TESTING': True
+        })
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+            warehouse = Warehouse(name='Stocked', location='Helsinki')
+            warehouse.items.append(Item(name='Item1', quantity=1.5))
+            db.session.add(warehouse)
+            db.session.add(Warehouse(name='Empty'))
+            db.session.commit()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_export_ndjson(self):
+        response = self.client.get('/export?format=ndjson')
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0]['item_name'], 'Item1')
+        self.assertEqual(lines[0]['warehouse_name'], 'Stocked')
+        self.assertIsNone(lines[1]['item_id'])
+
+    def test_export_csv(self):
+        response = self.client.get('/export?format=csv')
+        self.assertEqual(response.mimetype, 'text/csv')
+        rows = list(csv.reader(io.StringIO(response.text)))
+        self.assertEqual(rows[0][0], 'warehouse_id')
+        self.assertEqual(rows[1][1:], ['Stocked', 'Helsinki', '1',
+                                       'Item1', '1.5'])
+        self.assertEqual(len(rows), 3)
+
+    def test_export_unsupported_format(self):
+        response = self.client.get('/export?format=xml')
+        self.assertEqual(response.status_code, 400)
+
+
 class TestItemAPI(unittest.TestCase):
     def setUp(self):
         self.app = create_app({
@@ -181,6 +271,64 @@ class TestItemAPI(unittest.TestCase):
         )
         self.assertEqual(response.status_code, 404)
 
+    def test_update_item_rejects_non_numeric_quantity(self):
+        item_url = f'/warehouses/{self.warehouse_id}/items/' + str(
+            self.client.post(f'/warehouses/{self.warehouse_id}/items',
+                             json={'name': 'Test Item', 'quantity': 5}).json['id']
+        )
+        for quantity in ('abc', None, [1]):
+            response = self.client.put(item_url, json={'quantity': quantity})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json['error'],
+                             'Quantity must be a number')
+        self.assertAlmostEqual(self.client.get(item_url).json['quantity'], 5.0)
+
+        response = self.client.put(item_url, json={'name': 'Renamed'})
+        self.assertEqual(response.status_code, 200)
+        self.assertAlmostEqual(response.json['quantity'], 5.0)
+
+    def test_bulk_add_items_json(self):
+        response = self.client.post(
+            f'/warehouses/{self.warehouse_id}/items:bulk',
+            json=[
+                {'name': 'Bulk1', 'quantity': 1},
+                {'quantity': 2},
+                {'name': 'Bulk3', 'quantity': -1},
+                {'name': 'Bulk4'}
+            ]
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json['inserted'], 2)
+        self.assertEqual(
+            [error['row'] for error in response.json['errors']], [1, 2]
+        )
+
+        warehouse = self.client.get(f'/warehouses/{self.warehouse_id}')
+        self.assertEqual(
+            [item['name'] for item in warehouse.json['items']],
+            ['Bulk1', 'Bulk4']
+        )
+
+    def test_bulk_add_items_ndjson(self):
+        body = '{"name": "A", "quantity": 1.5}\nnot json\n{"name": "B"}\n'
+        response = self.client.post(
+            f'/warehouses/{self.warehouse_id}/items:bulk',
+            data=body, content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.json['inserted'], 2)
+        self.assertEqual(response.json['errors'][0]['row'], 1)
+
+    def test_bulk_add_items_not_a_list(self):
+        response = self.client.post(
+            f'/warehouses/{self.warehouse_id}/items:bulk',
+            json={'name': 'A'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_add_items_nonexistent_warehouse(self):
+        response = self.client.post('/warehouses/9999/items:bulk', json=[])
+        self.assertEqual(response.status_code, 404)
+
     def test_item_appears_in_warehouse(self):
         self.client.post(
             f'/warehouses/{self.warehouse_id}/items',
@@ -195,6 +343,216 @@ class TestItemAPI(unittest.TestCase):
         self.assertEqual(len(response.json['items']), 2)
 
 
+class TestItemListing(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'TESTING': True
+        })
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            warehouse = Warehouse(name='Listed')
+            for name, quantity in [('Cider', 3), ('Apple', 5), ('Beer', 3),
+                                   ('Donut', 1)]:
+                warehouse.items.append(Item(name=name, quantity=quantity))
+            db.session.add(warehouse)
+            db.session.commit()
+            self.url = f'/warehouses/{warehouse.id}/items'
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def _walk(self, query):
+        names = []
+        response = self.client.get(f'{self.url}?{query}')
+        while True:
+            names.extend(item['name'] for item in response.json)
+            cursor = response.headers.get('X-Next-After')
+            if not cursor:
+                return names
+            response = self.client.get(f'{self.url}?{query}&after={cursor}')
+
+    def test_list_items_by_id(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json[0], {
+            'id': 1, 'name': 'Cider', 'quantity': 3.0, 'warehouse_id': 1
+        })
+        self.assertEqual(self._walk('limit=3'),
+                         ['Cider', 'Apple', 'Beer', 'Donut'])
+
+    def test_list_items_sorted_by_name(self):
+        self.assertEqual(self._walk('sort=name&limit=1'),
+                         ['Apple', 'Beer', 'Cider', 'Donut'])
+
+    def test_list_items_sorted_by_quantity_descending(self):
+        self.assertEqual(self._walk('sort=-quantity&limit=2'),
+                         ['Apple', 'Beer', 'Cider', 'Donut'])
+
+    def test_list_items_not_modified(self):
+        etag = self.client.get(self.url).headers['ETag']
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_items_invalid_arguments(self):
+        self.assertEqual(
+            self.client.get(f'{self.url}?sort=color').status_code, 400
+        )
+        self.assertEqual(
+            self.client.get(f'{self.url}?sort=name&after=x').status_code, 400
+        )
+        for value in ([1], {'a': 1}, True, None):
+            after = base64.urlsafe_b64encode(
+                json.dumps([value, 2]).encode()
+            ).decode()
+            self.assertEqual(self.client.get(
+                f'{self.url}?sort=name&after={after}'
+            ).status_code, 400)
+        self.assertEqual(
+            self.client.get('/warehouses/9999/items').status_code, 404
+        )
+
+
+class TestStockAPI(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'TESTING': True
+        })
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+            warehouse = Warehouse(name='Limited', capacity=10.0)
+            warehouse.items.append(Item(name='Juice', quantity=4.0))
+            warehouse.items.append(Item(name='Beer', quantity=2.0))
+            db.session.add(warehouse)
+            db.session.commit()
+            self.warehouse_id = warehouse.id
+            self.item_id = warehouse.items[0].id
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def _post(self, action, amount):
+        return self.client.post(
+            f'/warehouses/{self.warehouse_id}/items/{self.item_id}/{action}',
+            json={'amount': amount}
+        )
+
+    def test_create_warehouse_with_capacity(self):
+        response = self.client.post('/warehouses', json={
+            'name': 'Capacity', 'capacity': -5
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertAlmostEqual(response.json['capacity'], 0.0)
+
+    def test_create_warehouse_invalid_capacity(self):
+        response = self.client.post('/warehouses', json={
+            'name': 'Capacity', 'capacity': 'lots'
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def test_add_stock(self):
+        response = self._post('add', 3)
+        self.assertEqual(response.status_code, 200)
+        self.assertAlmostEqual(response.json['quantity'], 7.0)
+
+    def test_add_stock_clamps_to_free_space(self):
+        response = self._post('add', 100)
+        self.assertAlmostEqual(response.json['quantity'], 8.0)
+
+    def test_add_stock_negative_is_ignored(self):
+        response = self._post('add', -3)
+        self.assertAlmostEqual(response.json['quantity'], 4.0)
+
+    def test_add_stock_without_capacity_is_unlimited(self):
+        self.client.put(f'/warehouses/{self.warehouse_id}',
+                        json={'capacity': None})
+        response = self._post('add', 100)
+        self.assertAlmostEqual(response.json['quantity'], 104.0)
+
+    def test_take_stock(self):
+        response = self._post('take', 1.5)
+        self.assertAlmostEqual(response.json['taken'], 1.5)
+        self.assertAlmostEqual(response.json['quantity'], 2.5)
+
+    def test_take_stock_more_than_available(self):
+        response = self._post('take', 10)
+        self.assertAlmostEqual(response.json['taken'], 4.0)
+        self.assertAlmostEqual(response.json['quantity'], 0.0)
+
+    def test_take_stock_negative_takes_nothing(self):
+        response = self._post('take', -1)
+        self.assertAlmostEqual(response.json['taken'], 0.0)
+        self.assertAlmostEqual(response.json['quantity'], 4.0)
+
+    def test_stock_invalid_amount(self):
+        self.assertEqual(self._post('add', 'x').status_code, 400)
+        self.assertEqual(self._post('take', 'x').status_code, 400)
+
+    def test_stock_item_not_found(self):
+        self.item_id = 9999
+        self.assertEqual(self._post('add', 1).status_code, 404)
+        self.assertEqual(self._post('take', 1).status_code, 404)
+
+    def _total_quantity(self):
+        return self.client.get('/warehouses/summary').json[0]['total_quantity']
+
+    def test_new_item_clamps_to_free_space(self):
+        response = self.client.post(
+            f'/warehouses/{self.warehouse_id}/items',
+            json={'name': 'Cider', 'quantity': 50}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertAlmostEqual(response.json['quantity'], 4.0)
+        self.assertAlmostEqual(self._total_quantity(), 10.0)
+
+    def test_bulk_items_clamp_to_free_space(self):
+        response = self.client.post(
+            f'/warehouses/{self.warehouse_id}/items:bulk',
+            json=[{'name': 'A', 'quantity': 3}, {'name': 'B', 'quantity': 500},
+                  {'name': 'C', 'quantity': 1}]
+        )
+        self.assertEqual(response.json['inserted'], 3)
+        items = self.client.get(f'/warehouses/{self.warehouse_id}').json
+        self.assertEqual([i['quantity'] for i in items['items'][2:]],
+                         [3.0, 1.0, 0.0])
+        self.assertAlmostEqual(self._total_quantity(), 10.0)
+
+        self._post('take', 4)
+        self.assertAlmostEqual(self._post('add', 2).json['quantity'], 2.0)
+
+    def test_item_update_clamps_to_free_space(self):
+        response = self.client.put(
+            f'/warehouses/{self.warehouse_id}/items/{self.item_id}',
+            json={'quantity': 100}
+        )
+        self.assertAlmostEqual(response.json['quantity'], 8.0)
+        response = self.client.put(
+            f'/warehouses/{self.warehouse_id}/items/{self.item_id}',
+            json={'quantity': 1}
+        )
+        self.assertAlmostEqual(response.json['quantity'], 1.0)
+
+    def test_batch_and_import_clamp_to_free_space(self):
+        response = self.client.post('/batch', json=[{
+            'op': 'create_item', 'warehouse_id': self.warehouse_id,
+            'name': 'Cider', 'quantity': 3
+        }])
+        self.assertAlmostEqual(response.json['results'][0]['quantity'], 3.0)
+        response = self.client.post(
+            '/import', data='warehouse,item,quantity\n'
+            'Limited,Wine,5\nLimited,Wine,5\nOther,Wine,5\n',
+            content_type='text/csv'
+        )
+        self.assertEqual(response.json['items_inserted'], 3)
+        wines = self.client.get('/items?name=Wine').json
+        self.assertEqual([i['quantity'] for i in wines], [1.0, 0.0, 5.0])
+        self.assertAlmostEqual(self._total_quantity(), 10.0)
+
+
 class TestWarehouseUI(unittest.TestCase):
     def setUp(self):
         self.app = create_app({
@@ -233,6 +591,20 @@ class TestWarehouseUI(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn(b'Edit Test', response.data)
 
+    def test_edit_warehouse_duplicate_name(self):
+        with self.app.app_context():
+            db.session.add(Warehouse(name='Taken'))
+            warehouse = Warehouse(name='Edit Me')
+            db.session.add(warehouse)
+            db.session.commit()
+            warehouse_id = warehouse.id
+
+        response = self.client.post(f'/warehouses/{warehouse_id}/edit',
+                                    data={'name': 'Taken'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Warehouse name already exists', response.data)
+        self.assertIn(b'Edit Me', response.data)
+
     def test_view_warehouse_page(self):
         with self.app.app_context():
             warehouse = Warehouse(name='View Test')
@@ -244,6 +616,33 @@ class TestWarehouseUI(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn(b'View Test', response.data)
 
+    def test_index_shows_item_aggregates(self):
+        with self.app.app_context():
+            warehouse = Warehouse(name='Aggregate Test')
+            warehouse.items.append(Item(name='A', quantity=1.5))
+            warehouse.items.append(Item(name='B', quantity=2.5))
+            db.session.add(warehouse)
+            db.session.commit()
+
+        response = self.client.get('/')
+        self.assertIn(b'<td>2</td>', response.data)
+        self.assertIn(b'<td>4.0</td>', response.data)
+
+    def test_view_warehouse_paginates_items(self):
+        with self.app.app_context():
+            warehouse = Warehouse(name='Paged')
+            for i in range(3):
+                warehouse.items.append(Item(name=f'Paged{i}', quantity=i))
+            db.session.add(warehouse)
+            db.session.commit()
+            warehouse_id = warehouse.id
+
+        response = self.client.get(f'/warehouses/{warehouse_id}/view?limit=2')
+        self.assertIn(b'Items (3)', response.data)
+        self.assertIn(b'Paged1', response.data)
+        self.assertNotIn(b'Paged2', response.data)
+        self.assertIn(b'Next Page', response.data)
+
     def test_delete_warehouse_form(self):
         with self.app.app_context():
             warehouse = Warehouse(name='Delete Test')
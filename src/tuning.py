@@ -0,0 +1,66 @@
+import os
+from functools import partial
+from sqlalchemy import event
+from models import db
+
+PRODUCTION_PROFILE = 'production'
+
+PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+}
+
+WRITE_PRAGMAS = ('journal_mode', 'synchronous')
+
+_PRAGMA_ENV = {
+    'busy_timeout': 'SQLITE_BUSY_TIMEOUT',
+    'mmap_size': 'SQLITE_MMAP_SIZE',
+    'cache_size': 'SQLITE_CACHE_SIZE',
+}
+
+_POOL_ENV = {
+    'pool_size': 'DB_POOL_SIZE',
+    'max_overflow': 'DB_MAX_OVERFLOW',
+    'pool_timeout': 'DB_POOL_TIMEOUT',
+}
+
+
+def _int_options(names):
+    return {
+        option: int(os.environ[variable])
+        for option, variable in names.items() if variable in os.environ
+    }
+
+
+def config_from_env():
+    return {
+        'DATABASE_PROFILE': os.getenv('DATABASE_PROFILE', 'default'),
+        'SQLITE_PRAGMAS': _int_options(_PRAGMA_ENV),
+        'SQLALCHEMY_ENGINE_OPTIONS': _int_options(_POOL_ENV),
+    }
+
+
+def _apply_pragmas(pragmas, dbapi_connection, _connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name}={value}')
+    cursor.close()
+
+
+def configure_engine(app):
+    if app.config.get('DATABASE_PROFILE') != PRODUCTION_PROFILE:
+        return
+    pragmas = {**PRODUCTION_PRAGMAS, **app.config.get('SQLITE_PRAGMAS', {})}
+    for key, engine in db.engines.items():
+        if engine.dialect.name != 'sqlite':
+            continue
+        # Read replicas may be opened read-only and never write, so they
+        # only get the pragmas that tune reads
+        options = pragmas if key is None else {
+            name: value for name, value in pragmas.items()
+            if name not in WRITE_PRAGMAS
+        }
+        event.listen(engine, 'connect', partial(_apply_pragmas, options))
@@ -0,0 +1,29 @@
+def validate_item(name, quantity):
+    if not name or not str(name).strip():
+        return None, 'Item name is required'
+
+    try:
+        quantity = float(quantity)
+    except (ValueError, TypeError):
+        quantity = 0.0
+
+    if quantity < 0:
+        return None, 'Quantity cannot be negative'
+
+    return {'name': str(name).strip(), 'quantity': quantity}, None
+
+
+def parse_capacity(capacity):
+    if capacity is None or capacity == '':
+        return None, None
+    try:
+        return max(0.0, float(capacity)), None
+    except (ValueError, TypeError):
+        return None, 'Capacity must be a number'
+
+
+def parse_quantity(quantity):
+    try:
+        return float(quantity), None
+    except (ValueError, TypeError):
+        return None, 'Quantity must be a number'
@@ -1,4 +1,14 @@
+from array import array
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
 class Varasto:
+    __slots__ = ("tilavuus", "saldo")
+
     def __init__(self, tilavuus, alku_saldo=0):
         self.tilavuus = max(0.0, tilavuus)
         self.saldo = self._alkusaldon_rajaus(alku_saldo)
@@ -35,3 +45,133 @@ class Varasto:
 
     def __str__(self):
         return f"saldo = {self.saldo}, vielä tilaa {self.paljonko_mahtuu()}"
+
+
+# Joukko varastoja yhtenäisinä taulukkoina, samat säännöt kuin Varastolla.
+# Käyttää NumPyä jos se on asennettu, muuten array-moduulia.
+class VarastoArray:
+    def __init__(self, tilavuudet, alku_saldot=None):
+        if alku_saldot is None:
+            alku_saldot = [0.0] * len(tilavuudet)
+        if len(alku_saldot) != len(tilavuudet):
+            raise ValueError("tilavuudet ja alku_saldot eri pituisia")
+
+        if numpy is not None:
+            self.tilavuus = numpy.maximum(
+                numpy.asarray(tilavuudet, dtype=float), 0.0
+            )
+            alku = numpy.asarray(alku_saldot, dtype=float)
+            self.saldo = numpy.where(
+                alku < 0, 0.0, numpy.minimum(alku, self.tilavuus)
+            )
+        else:
+            self.tilavuus = array("d", (max(0.0, t) for t in tilavuudet))
+            self.saldo = array("d", (
+                0.0 if a < 0 else min(a, t)
+                for a, t in zip(alku_saldot, self.tilavuus)
+            ))
+
+    def __len__(self):
+        return len(self.tilavuus)
+
+    def _tarkista_pituus(self, maarat):
+        if len(maarat) != len(self):
+            raise ValueError("maarat eri pituinen kuin varastot")
+
+    def paljonko_mahtuu(self):
+        if numpy is not None:
+            return self.tilavuus - self.saldo
+        return array("d", (t - s for t, s in zip(self.tilavuus, self.saldo)))
+
+    def lisaa_varastoon(self, maarat):
+        self._tarkista_pituus(maarat)
+        if numpy is not None:
+            # negatiivinen määrä ei muuta saldoa, joten sen voi nollata
+            maarat = numpy.maximum(numpy.asarray(maarat, dtype=float), 0.0)
+            self.saldo = numpy.where(
+                maarat <= self.tilavuus - self.saldo,
+                self.saldo + maarat, self.tilavuus
+            )
+            return
+
+        for i, maara in enumerate(maarat):
+            if maara < 0:
+                continue
+            if maara <= self.tilavuus[i] - self.saldo[i]:
+                self.saldo[i] = self.saldo[i] + maara
+            else:
+                self.saldo[i] = self.tilavuus[i]
+
+    def ota_varastosta(self, maarat):
+        self._tarkista_pituus(maarat)
+        if numpy is not None:
+            maarat = numpy.maximum(numpy.asarray(maarat, dtype=float), 0.0)
+            saatu = numpy.minimum(maarat, self.saldo)
+            self.saldo = self.saldo - saatu
+            return saatu
+
+        saatu = array("d", bytes(8 * len(self)))
+        for i, maara in enumerate(maarat):
+            if maara < 0:
+                continue
+            saatu[i] = min(maara, self.saldo[i])
+            self.saldo[i] = self.saldo[i] - saatu[i]
+        return saatu
+
+
+def toista(varasto, maarat):
+    # etumerkilliset tapahtumat: positiivinen lisää, negatiivinen ottaa
+    for maara in maarat:
+        if maara >= 0:
+            varasto.lisaa_varastoon(maara)
+        else:
+            varasto.ota_varastosta(-maara)
+    return varasto.saldo
+
+
+# Varasto, joka kirjaa jokaisen lisäyksen ja oton tapahtumaksi. Tapahtumat
+# ovat etumerkillisiä pyydettyjä määriä (lisäys +, otto -), ja saldo
+# tallennetaan tilannekuvaksi joka tilannevali:nnen tapahtuman jälkeen,
+# joten menneen hetken saldo toistetaan enintään tilannevalin verran.
+class VarastoKirjanpito:
+    def __init__(self, tilavuus, alku_saldo=0, tilannevali=1024):
+        if tilannevali < 1:
+            raise ValueError("tilannevali pitää olla positiivinen")
+        self.varasto = Varasto(tilavuus, alku_saldo)
+        self.tilannevali = tilannevali
+        self.tapahtumat = array("d")
+        self._tilanteet = array("d", [self.varasto.saldo])
+
+    def __len__(self):
+        return len(self.tapahtumat)
+
+    @property
+    def saldo(self):
+        return self.varasto.saldo
+
+    def _kirjaa(self, maara):
+        self.tapahtumat.append(maara)
+        if len(self.tapahtumat) % self.tilannevali == 0:
+            self._tilanteet.append(self.varasto.saldo)
+
+    def lisaa_varastoon(self, maara):
+        self.varasto.lisaa_varastoon(maara)
+        self._kirjaa(max(0.0, maara))
+
+    def ota_varastosta(self, maara):
+        saatu = self.varasto.ota_varastosta(maara)
+        self._kirjaa(-max(0.0, maara))
+        return saatu
+
+    def kirjaa_tapahtumat(self, maarat):
+        return toista(self, maarat)
+
+    def saldo_hetkella(self, tapahtumia):
+        # saldo ensimmäisten tapahtumia kpl tapahtuman jälkeen
+        if not 0 <= tapahtumia <= len(self.tapahtumat):
+            raise IndexError("tapahtumaa ei ole kirjattu")
+        tilanne = tapahtumia // self.tilannevali
+        return toista(
+            Varasto(self.varasto.tilavuus, self._tilanteet[tilanne]),
+            self.tapahtumat[tilanne * self.tilannevali:tapahtumia]
+        )